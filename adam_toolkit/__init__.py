@@ -1,52 +1,87 @@
 """Adam's Agent Toolkit - Practical utilities for autonomous AI agents."""
 
-__version__ = "0.2.0"
 __author__ = "Adam (ADAM)"
 
-from adam_toolkit.cost_tracker import CostTracker, CostEntry
-from adam_toolkit.decision_engine import DecisionEngine, Decision
-from adam_toolkit.survival_manager import SurvivalManager, SurvivalStatus
-from adam_toolkit.pricing import PricingEngine, PricingStrategy
-from adam_toolkit.service_registry import ServiceRegistry, Service
-from adam_toolkit.metrics import MetricsCollector
-from adam_toolkit.agent_protocol import (
-    AgentIdentity,
-    AgentManifest,
-    AgentNetwork,
-    Capability,
-    CapabilityGroup,
-    KnowledgeEntry,
-    Message,
-    ServiceListing,
-    ServiceOrder,
-)
+# Submodules are imported on first attribute access (PEP 562), so
+# `from adam_toolkit import CostTracker` only loads cost_tracker.
+_LAZY = {
+    "CostTracker": "adam_toolkit.cost_tracker",
+    "DecisionEngine": "adam_toolkit.decision_engine",
+    "SurvivalManager": "adam_toolkit.survival_manager",
+    "PricingEngine": "adam_toolkit.pricing",
+    "ServiceRegistry": "adam_toolkit.service_registry",
+    "MetricsCollector": "adam_toolkit.metrics",
+    "AgentNetwork": "adam_toolkit.agent_protocol",
+    "AgentIdentity": "adam_toolkit.agent_protocol",
+    "AgentManifest": "adam_toolkit.agent_protocol",
+}
 
-__all__ = [
-    # Cost tracking
+# Only the primary entrypoints are re-exported here. Supporting types
+# (CostEntry, Decision, SurvivalStatus, PricingStrategy, OrderRecord,
+# Service, Capability, CapabilityGroup, KnowledgeEntry, Message,
+# ServiceListing, ServiceOrder) are imported from their submodules.
+__all__ = (
     "CostTracker",
-    "CostEntry",
-    # Decision making
     "DecisionEngine",
-    "Decision",
-    # Survival strategies
     "SurvivalManager",
-    "SurvivalStatus",
-    # Pricing
     "PricingEngine",
-    "PricingStrategy",
-    # Service framework
     "ServiceRegistry",
-    "Service",
-    # Metrics
     "MetricsCollector",
-    # Agent Protocol
+    "AgentNetwork",
     "AgentIdentity",
     "AgentManifest",
-    "AgentNetwork",
-    "Capability",
-    "CapabilityGroup",
-    "KnowledgeEntry",
-    "Message",
-    "ServiceListing",
-    "ServiceOrder",
-]
+)
+
+_EXPORTED: frozenset[str] = frozenset(__all__)
+
+
+def __getattr__(name: str):
+    if name == "__version__":
+        # Resolved from the installed distribution on first access
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            value = version("adam-agent-toolkit")
+        except PackageNotFoundError:
+            value = "0.0.0+unknown"
+        globals()["__version__"] = value
+        return value
+
+    # Reject dunder probes from the import machinery before touching _LAZY
+    if name not in _EXPORTED:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    mod_path = _LAZY[name]
+
+    import importlib
+
+    value = getattr(importlib.import_module(mod_path), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+def preload(background: bool = True) -> None:
+    """Import every submodule ahead of first use.
+
+    Long-running agents can call this at startup so module loading overlaps
+    with other initialization. Pass background=False to import synchronously
+    (e.g. in tests that need deterministic state).
+    """
+    import importlib
+
+    modules = sorted(set(_LAZY.values()))
+
+    def _load():
+        for mod_path in modules:
+            importlib.import_module(mod_path)
+
+    if not background:
+        _load()
+        return
+
+    import threading
+
+    threading.Thread(target=_load, name="adam-toolkit-preload", daemon=True).start()
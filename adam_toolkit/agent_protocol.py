@@ -11,21 +11,42 @@ enabling agents to:
 Compatible with the Singularity runtime (marketplace, knowledge_sharing,
 task_delegator, orchestrator skills).
 
-All persistence is file-based JSON for simplicity and portability.
+Persistence is file-based: JSON/JSONL files for knowledge and inboxes,
+and a SQLite database (stdlib sqlite3, WAL mode) for the agent registry,
+marketplace and orders.
 """
 
 from __future__ import annotations
 
+import base64
+import functools
 import hashlib
+import heapq
 import json
 import os
+import sqlite3
+import sys
 import time
-import uuid
-from dataclasses import dataclass, field, asdict
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from enum import Enum
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+try:
+    import orjson
+except ImportError:  # Optional speedup: pip install adam-agent-toolkit[fast]
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: stores fall back to unlocked writes
+    fcntl = None
 
 
 # ─── Configuration ────────────────────────────────────────────────────────────
@@ -35,9 +56,48 @@ DEFAULT_DATA_DIR = os.environ.get(
     os.path.join(os.path.expanduser("~"), ".agent_data"),
 )
 
+# Indent JSON store files for manual inspection (compact by default)
+PRETTY_JSON = os.environ.get("AGENT_PRETTY_JSON", "") not in ("", "0")
+
 KNOWLEDGE_TTL_DAYS = 7
 MAX_MESSAGE_QUEUE = 1000
+INBOX_SHARDS = 256  # Inbox files are spread over this many subdirectories
 CAPABILITY_MATCH_THRESHOLD = 0.3
+MATCH_INDEX_MIN_ACTIONS = 32  # Manifests above this use an inverted word index
+KNOWLEDGE_QUERY_CACHE_SIZE = 128
+KNOWLEDGE_QUERY_CACHE_TTL = 60.0  # Seconds; bounds staleness of expiry/recency
+
+
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+
+
+@functools.lru_cache(maxsize=4096)
+def _iso_to_ts(value: str) -> float:
+    """Parse an ISO-8601 timestamp to epoch seconds (naive values are UTC)."""
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        # Same result as attaching UTC and calling timestamp(), which does
+        # this subtraction internally, minus building a second datetime
+        return (dt - _NAIVE_EPOCH).total_seconds()
+    return dt.timestamp()
+
+
+def _new_id() -> str:
+    """Random 128-bit ID as 22 characters of unpadded base64url."""
+    return base64.urlsafe_b64encode(os.urandom(16)).rstrip(b"=").decode("ascii")
+
+
+_FIELD_NAMES: Dict[type, FrozenSet[str]] = {}
+
+
+def _init_kwargs(cls: type, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the keys of `data` that are fields of dataclass `cls`."""
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = frozenset(cls.__dataclass_fields__)
+    if names.issuperset(data):
+        return data  # Common case: stored dicts carry no extra keys
+    return {k: v for k, v in data.items() if k in names}
 
 
 # ─── Data Types ───────────────────────────────────────────────────────────────
@@ -78,7 +138,7 @@ class KnowledgeCategory(str, Enum):
     MARKET = "market"
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentIdentity:
     """Core identity of an agent on the network."""
     agent_id: str
@@ -89,11 +149,18 @@ class AgentIdentity:
     version: str = "0.1.0"
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "agent_id": self.agent_id,
+            "name": self.name,
+            "ticker": self.ticker,
+            "agent_type": self.agent_type,
+            "specialty": self.specialty,
+            "version": self.version,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "AgentIdentity":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return cls(**_init_kwargs(cls, data))
 
 
 @dataclass
@@ -105,11 +172,39 @@ class Capability:
     estimated_cost: float = 0.0
     tags: List[str] = field(default_factory=list)
 
-    def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+    def __post_init__(self):
+        # Tag vocabularies overlap heavily across agents; share one string each
+        self.tags = [sys.intern(t) for t in self.tags]
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "parameters": self.parameters,
+            "estimated_cost": self.estimated_cost,
+            "tags": self.tags,
+        }
 
-@dataclass
+    def _match_terms(self) -> Tuple[FrozenSet[str], str]:
+        """Lowercased search words and name, cached until the fields change."""
+        cached = self.__dict__.get("_match_cache")
+        if (
+            cached is not None
+            and cached[0] is self.name
+            and cached[1] is self.description
+            and cached[2] == self.tags
+        ):
+            return cached[3]
+        name_lower = self.name.lower()
+        words = frozenset(self.description.lower().split())
+        words |= frozenset(name_lower.replace("_", " ").split())
+        words |= frozenset(t.lower() for t in self.tags)
+        terms = (words, name_lower)
+        self.__dict__["_match_cache"] = (self.name, self.description, list(self.tags), terms)
+        return terms
+
+
+@dataclass(slots=True)
 class CapabilityGroup:
     """A group of related capabilities (a skill)."""
     skill_id: str
@@ -119,9 +214,13 @@ class CapabilityGroup:
     category: str = "general"
 
     def to_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
-        d["actions"] = [a.to_dict() for a in self.actions]
-        return d
+        return {
+            "skill_id": self.skill_id,
+            "name": self.name,
+            "description": self.description,
+            "actions": [a.to_dict() for a in self.actions],
+            "category": self.category,
+        }
 
 
 @dataclass
@@ -194,40 +293,97 @@ class AgentManifest:
             manifest_hash=data.get("manifest_hash", ""),
         )
 
+    def _indexed_overlaps(
+        self, terms: List[Tuple[FrozenSet[str], str]], query_words: FrozenSet[str]
+    ) -> List[int]:
+        """Per-action query overlap counts from an inverted word index.
+
+        The index is rebuilt whenever any action's match terms change.
+        """
+        cached = self.__dict__.get("_match_index")
+        if (
+            cached is None
+            or len(cached[0]) != len(terms)
+            or any(a is not b for a, b in zip(cached[0], terms))
+        ):
+            index: Dict[str, List[int]] = {}
+            for i, (words, _) in enumerate(terms):
+                for word in words:
+                    index.setdefault(word, []).append(i)
+            cached = (terms, index)
+            self.__dict__["_match_index"] = cached
+
+        counts = [0] * len(terms)
+        index = cached[1]
+        for word in query_words:
+            for i in index.get(word, ()):
+                counts[i] += 1
+        return counts
+
     def match_request(self, query: str, threshold: float = CAPABILITY_MATCH_THRESHOLD) -> List[Tuple[str, str, float]]:
         """Match a natural language query to capabilities.
 
         Returns list of (skill_id, action_name, score) sorted by score descending.
         """
-        query_words = set(query.lower().split())
+        query_lower = query.lower()
+        query_words = frozenset(query_lower.split())
+        query_len = max(len(query_words), 1)
         matches = []
 
-        for group in self.capabilities:
-            for action in group.actions:
-                # Score based on keyword overlap
-                desc_words = set(action.description.lower().split())
-                name_words = set(action.name.lower().replace("_", " ").split())
-                tag_words = set(t.lower() for t in action.tags)
+        entries = [
+            (group.skill_id, action.name, action._match_terms())
+            for group in self.capabilities
+            for action in group.actions
+        ]
+        if len(entries) > MATCH_INDEX_MIN_ACTIONS:
+            overlaps = self._indexed_overlaps([terms for _, _, terms in entries], query_words)
+        else:
+            overlaps = [len(query_words & terms[0]) for _, _, terms in entries]
 
-                all_words = desc_words | name_words | tag_words
-                if not all_words:
-                    continue
+        for (skill_id, action_name, (all_words, name_lower)), overlap in zip(entries, overlaps):
+            # Score based on keyword overlap
+            if not all_words:
+                continue
 
-                overlap = len(query_words & all_words)
-                score = overlap / max(len(query_words), 1)
+            score = overlap / query_len
 
-                # Boost for exact name match
-                if query.lower() in action.name.lower():
-                    score += 0.3
+            # Boost for exact name match
+            if query_lower in name_lower:
+                score += 0.3
 
-                if score >= threshold:
-                    matches.append((group.skill_id, action.name, min(score, 1.0)))
+            if score >= threshold:
+                matches.append((skill_id, action_name, min(score, 1.0)))
 
         matches.sort(key=lambda x: x[2], reverse=True)
         return matches
 
 
-@dataclass
+def _message_expired(timestamp: str, ttl_seconds: int, now: Optional[float] = None) -> bool:
+    try:
+        sent = _iso_to_ts(timestamp)
+    except (ValueError, TypeError):
+        return False
+    return (time.time() if now is None else now) - sent > ttl_seconds
+
+
+def _is_expired_dict(msg_data: Dict[str, Any], now: Optional[float] = None) -> bool:
+    """Expiry check on a raw message dict, without building a Message."""
+    return _message_expired(
+        msg_data.get("timestamp", ""), msg_data.get("ttl_seconds", 3600), now
+    )
+
+
+def _drop_expired(inbox: List[Dict[str, Any]], now: float):
+    """Remove expired raw messages from `inbox` in place, keeping order."""
+    write = 0
+    for msg_data in inbox:
+        if not _is_expired_dict(msg_data, now):
+            inbox[write] = msg_data
+            write += 1
+    del inbox[write:]
+
+
+@dataclass(slots=True)
 class Message:
     """A message between agents."""
     message_id: str = ""
@@ -242,27 +398,33 @@ class Message:
 
     def __post_init__(self):
         if not self.message_id:
-            self.message_id = str(uuid.uuid4())
+            self.message_id = _new_id()
         if not self.timestamp:
             self.timestamp = datetime.utcnow().isoformat()
 
     @property
     def is_expired(self) -> bool:
-        try:
-            sent = datetime.fromisoformat(self.timestamp)
-            return (datetime.utcnow() - sent).total_seconds() > self.ttl_seconds
-        except (ValueError, TypeError):
-            return False
+        return _message_expired(self.timestamp, self.ttl_seconds)
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "message_id": self.message_id,
+            "from_agent": self.from_agent,
+            "to_agent": self.to_agent,
+            "message_type": self.message_type,
+            "subject": self.subject,
+            "body": self.body,
+            "timestamp": self.timestamp,
+            "reply_to": self.reply_to,
+            "ttl_seconds": self.ttl_seconds,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Message":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return cls(**_init_kwargs(cls, data))
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceListing:
     """A service published to the marketplace."""
     service_id: str = ""
@@ -283,9 +445,10 @@ class ServiceListing:
 
     def __post_init__(self):
         if not self.service_id:
-            self.service_id = str(uuid.uuid4())
+            self.service_id = _new_id()
         if not self.created_at:
             self.created_at = datetime.utcnow().isoformat()
+        self.tags = [sys.intern(t) for t in self.tags]
 
     @property
     def profit_margin(self) -> float:
@@ -294,14 +457,30 @@ class ServiceListing:
         return (self.price - self.estimated_cost) / self.price
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "service_id": self.service_id,
+            "agent_id": self.agent_id,
+            "name": self.name,
+            "description": self.description,
+            "skill_id": self.skill_id,
+            "action": self.action,
+            "price": self.price,
+            "pricing_model": self.pricing_model,
+            "estimated_cost": self.estimated_cost,
+            "sla_minutes": self.sla_minutes,
+            "tags": self.tags,
+            "status": self.status,
+            "created_at": self.created_at,
+            "total_orders": self.total_orders,
+            "total_revenue": self.total_revenue,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ServiceListing":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return cls(**_init_kwargs(cls, data))
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceOrder:
     """An order placed for a service."""
     order_id: str = ""
@@ -318,20 +497,31 @@ class ServiceOrder:
 
     def __post_init__(self):
         if not self.order_id:
-            self.order_id = str(uuid.uuid4())
+            self.order_id = _new_id()
         if not self.created_at:
             self.created_at = datetime.utcnow().isoformat()
 
     def to_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
-        return d
+        return {
+            "order_id": self.order_id,
+            "service_id": self.service_id,
+            "customer_agent_id": self.customer_agent_id,
+            "provider_agent_id": self.provider_agent_id,
+            "params": self.params,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+            "price_paid": self.price_paid,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ServiceOrder":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return cls(**_init_kwargs(cls, data))
 
 
-@dataclass
+@dataclass(slots=True)
 class KnowledgeEntry:
     """A piece of shared knowledge."""
     entry_id: str = ""
@@ -347,82 +537,612 @@ class KnowledgeEntry:
 
     def __post_init__(self):
         if not self.entry_id:
-            content_hash = hashlib.sha256(self.content.encode()).hexdigest()[:16]
+            # Content-addressed dedup key; SHA-256 keeps IDs stable across agents
+            content_hash = hashlib.sha256(
+                self.content.encode(), usedforsecurity=False
+            ).hexdigest()[:16]
             self.entry_id = content_hash
-        if not self.published_at:
-            self.published_at = datetime.utcnow().isoformat()
-        if not self.expires_at:
-            expires = datetime.utcnow() + timedelta(days=KNOWLEDGE_TTL_DAYS)
-            self.expires_at = expires.isoformat()
+        if not self.published_at or not self.expires_at:
+            now = datetime.utcnow()
+            if not self.published_at:
+                self.published_at = now.isoformat()
+            if not self.expires_at:
+                self.expires_at = (now + timedelta(days=KNOWLEDGE_TTL_DAYS)).isoformat()
 
     @property
     def is_expired(self) -> bool:
         try:
-            return datetime.utcnow() > datetime.fromisoformat(self.expires_at)
+            return time.time() > _iso_to_ts(self.expires_at)
         except (ValueError, TypeError):
             return False
 
     @property
     def relevance_score(self) -> float:
         """Compute relevance score factoring confidence, endorsements, disputes, recency."""
-        score = self.confidence
-        score += len(self.endorsements) * 0.05
-        score -= len(self.disputes) * 0.10
-        # Recency boost
-        try:
-            age_hours = (datetime.utcnow() - datetime.fromisoformat(self.published_at)).total_seconds() / 3600
-            recency_boost = max(0, 0.2 - (age_hours / 168) * 0.2)
-            score += recency_boost
-        except (ValueError, TypeError):
-            pass
-        return max(0, min(1.0, score))
+        return _relevance_score(
+            self.confidence, len(self.endorsements), len(self.disputes),
+            _stamp_ts(self.published_at, float("-inf")), time.time(),
+        )
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "entry_id": self.entry_id,
+            "content": self.content,
+            "category": self.category,
+            "confidence": self.confidence,
+            "tags": self.tags,
+            "published_by": self.published_by,
+            "published_at": self.published_at,
+            "expires_at": self.expires_at,
+            "endorsements": self.endorsements,
+            "disputes": self.disputes,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "KnowledgeEntry":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return cls(**_init_kwargs(cls, data))
+
+
+def _detached_entry(entry: KnowledgeEntry) -> KnowledgeEntry:
+    """Copy of `entry` with its own lists.
+
+    Entries hydrated from the store's cached dict (and kept in the query
+    cache) share their lists with it; callers get copies they may edit.
+    """
+    return replace(
+        entry,
+        tags=list(entry.tags),
+        endorsements=list(entry.endorsements),
+        disputes=list(entry.disputes),
+    )
+
+
+def _stamp_ts(value: Optional[str], default: float) -> float:
+    """Epoch seconds of an ISO-8601 stamp, or `default` if missing or unparseable."""
+    if not value:
+        return default
+    try:
+        return _iso_to_ts(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def _relevance_score(
+    confidence: float, endorsements: int, disputes: int, published_ts: float, now: float
+) -> float:
+    score = confidence
+    score += endorsements * 0.05
+    score -= disputes * 0.10
+    # Recency boost; an unknown publish time (-inf) gets none
+    age_hours = (now - published_ts) / 3600
+    score += max(0, 0.2 - (age_hours / 168) * 0.2)
+    return max(0, min(1.0, score))
+
+
+def _published_ts(published_at: Optional[str], now: float) -> float:
+    # A missing stamp is what from_dict would fill in as published now
+    return now if not published_at else _stamp_ts(published_at, float("-inf"))
+
+
+def _knowledge_relevance(
+    entry_data: Dict[str, Any], now: float, published_ts: Optional[float] = None
+) -> float:
+    """KnowledgeEntry.relevance_score computed on a raw knowledge dict.
+
+    `published_ts` may be passed pre-parsed (see _KnowledgeIndex.stamps).
+    """
+    if published_ts is None:
+        published_ts = _published_ts(entry_data.get("published_at"), now)
+    return _relevance_score(
+        entry_data.get("confidence", 0.5),
+        len(entry_data.get("endorsements") or ()),
+        len(entry_data.get("disputes") or ()),
+        published_ts,
+        now,
+    )
+
+
+def _knowledge_expired(entry_data: Dict[str, Any], now: float) -> bool:
+    """Expiry check on a raw knowledge dict, without building a KnowledgeEntry."""
+    # Missing or unparseable: from_dict would give a fresh TTL
+    return now > _stamp_ts(entry_data.get("expires_at"), float("inf"))
 
 
 # ─── File-Based Store ─────────────────────────────────────────────────────────
 
 
+@contextmanager
+def _file_lock(path: str):
+    """Hold an exclusive advisory lock on a `<path>.lock` sidecar file.
+
+    The sidecar is locked rather than `path` itself because saves replace
+    the data file (and so its inode) via os.replace.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _json_dumps(data: Any, *, indent: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option, default=str)
+    if indent:
+        return json.dumps(data, indent=2, default=str).encode()
+    return json.dumps(data, separators=(",", ":"), default=str).encode()
+
+
+def _json_loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_copy(value: Any) -> Any:
+    """Deep copy of a JSON-decoded value, by re-encoding it."""
+    return _json_loads(_json_dumps(value))
+
+
+@dataclass
+class _Unchanged:
+    """Mutator result telling JsonStore._locked_update to skip the save."""
+    value: Any = None
+
+
 class JsonStore:
-    """Simple file-based JSON persistence layer."""
+    """Simple file-based JSON persistence layer.
 
-    def __init__(self, file_path: str):
+    The parsed file is cached in-process and reused while the file's
+    inode, mtime and size are unchanged, so repeated loads skip the read
+    and decode. load() returns the cached dict itself: callers that
+    mutate it must follow up with save().
+
+    Files are written as compact JSON unless `pretty` is set (it defaults
+    to the AGENT_PRETTY_JSON environment variable).
+    """
+
+    def __init__(self, file_path: str, pretty: Optional[bool] = None):
         self.file_path = file_path
+        self.pretty = PRETTY_JSON if pretty is None else pretty
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_key: Optional[Tuple[int, int, int]] = None
         self._ensure_dir()
 
     def _ensure_dir(self):
         os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
 
+    def _stat_key(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.file_path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
     def load(self) -> Dict[str, Any]:
-        if not os.path.exists(self.file_path):
+        key = self._stat_key()
+        if key is None:
+            self._cache = self._cache_key = None
             return {}
+        if key == self._cache_key:
+            return self._cache
         try:
-            with open(self.file_path, "r") as f:
-                return json.load(f)
+            with open(self.file_path, "rb") as f:
+                data = _json_loads(f.read())
         except (json.JSONDecodeError, IOError):
+            self._cache = self._cache_key = None
             return {}
+        self._cache, self._cache_key = data, key
+        return data
 
     def save(self, data: Dict[str, Any]):
         self._ensure_dir()
         tmp = self.file_path + ".tmp"
-        with open(tmp, "w") as f:
-            json.dump(data, f, indent=2, default=str)
+        payload = _json_dumps(data, indent=self.pretty)
+        with open(tmp, "wb") as f:
+            f.write(payload)
         os.replace(tmp, self.file_path)
+        # Cache what was written (not `data`, which may hold non-JSON values
+        # and stays owned by the caller), skipping the disk read on next load
+        self._cache, self._cache_key = _json_loads(payload), self._stat_key()
+
+    def _locked_update(self, mutator: Callable[[Dict[str, Any]], Any]) -> Any:
+        """Load, mutate in place and save while holding the file lock.
+
+        Serializes read-modify-write cycles across processes sharing the
+        file, so concurrent writers don't drop each other's changes.
+        Returns whatever `mutator` returns; a mutator that made no change
+        returns `_Unchanged(result)` to leave the file untouched.
+        """
+        with _file_lock(self.file_path):
+            data = self.load()
+            try:
+                result = mutator(data)
+            except BaseException:
+                self._cache = self._cache_key = None  # Drop the half-mutated copy
+                raise
+            if isinstance(result, _Unchanged):
+                return result.value
+            self.save(data)
+            return result
 
     def update(self, key: str, value: Any):
-        data = self.load()
-        data[key] = value
-        self.save(data)
+        self._locked_update(lambda data: data.__setitem__(key, value))
 
     def delete(self, key: str):
-        data = self.load()
-        data.pop(key, None)
-        self.save(data)
+        self._locked_update(lambda data: data.pop(key, None))
+
+
+def _parse_lines(lines: List[bytes]) -> List[Dict[str, Any]]:
+    """Decode JSON Lines, skipping blank and malformed lines."""
+    records = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            records.append(_json_loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
+
+
+class JsonlStore:
+    """Append-only JSON Lines file, one record per line.
+
+    Appending writes only the new record; reading or rewriting touches the
+    whole file. Lines that fail to parse are skipped.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        # Records parsed so far, and how far into which file they reach
+        self._cache: List[Dict[str, Any]] = []
+        self._cache_ino: Optional[int] = None
+        self._cache_offset = 0
+        self._cache_tail = b""  # Last parsed line, to detect a replaced file
+
+    def append(self, record: Dict[str, Any]):
+        self.extend([record])
+
+    def extend(self, records: List[Dict[str, Any]]):
+        payload = b"".join(_json_dumps(r) + b"\n" for r in records)
+        # Locked so an append can't land in a file that rewrite() is replacing
+        with _file_lock(self.file_path):
+            with open(self.file_path, "ab") as f:
+                f.write(payload)
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """All records in the file.
+
+        Parsed records are cached: if the file has only been appended to
+        since the last read, just the new tail is parsed. The record dicts
+        are shared with the cache and must not be mutated.
+        """
+        try:
+            with open(self.file_path, "rb") as f:
+                if not self._cache_valid(f):
+                    self._set_cache([], os.fstat(f.fileno()).st_ino, 0, b"")
+                f.seek(self._cache_offset)
+                chunk = f.read()
+        except IOError:
+            self._set_cache([], None, 0, b"")
+            return []
+        end = chunk.rfind(b"\n") + 1  # Leave a partly written line for later
+        if end:
+            lines = chunk[:end].splitlines()
+            self._cache.extend(_parse_lines(lines))
+            self._cache_offset += end
+            self._cache_tail = lines[-1]
+        return list(self._cache)
+
+    def _cache_valid(self, f) -> bool:
+        st = os.fstat(f.fileno())
+        if st.st_ino != self._cache_ino or st.st_size < self._cache_offset:
+            return False
+        if self._cache_offset:
+            # Same inode, but it may have been reused by a rewrite
+            f.seek(self._cache_offset - len(self._cache_tail) - 1)
+            if f.read(len(self._cache_tail) + 1) != self._cache_tail + b"\n":
+                return False
+        return True
+
+    def _set_cache(self, records: List[Dict[str, Any]], ino: Optional[int], offset: int, tail: bytes):
+        self._cache, self._cache_ino = records, ino
+        self._cache_offset, self._cache_tail = offset, tail
+
+    def rewrite(self, records: List[Dict[str, Any]]):
+        tmp = self.file_path + ".tmp"
+        lines = [_json_dumps(r) for r in records]
+        payload = b"".join(line + b"\n" for line in lines)
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            ino = os.fstat(f.fileno()).st_ino
+        os.replace(tmp, self.file_path)
+        self._set_cache(list(records), ino, len(payload), lines[-1] if lines else b"")
+
+    def _locked_update(self, mutator: Callable[[List[Dict[str, Any]]], Any]) -> Any:
+        """Read all records, let `mutator` edit the list in place, and
+        rewrite the file, all under the file lock. Returns the mutator's
+        result."""
+        with _file_lock(self.file_path):
+            records = self.read_all()
+            result = mutator(records)
+            self.rewrite(records)
+            return result
+
+
+def _connect_sqlite(db_path: str) -> sqlite3.Connection:
+    """Open a SQLite database in WAL mode, shared safely between processes."""
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+@contextmanager
+def _sqlite_transaction(conn: sqlite3.Connection):
+    """Run a block as one write transaction (BEGIN IMMEDIATE ... COMMIT).
+
+    The write lock is taken up front, so reads inside the block see data
+    no other writer can change before the commit. Use the stores' private
+    `_put` inside the block; their public writers commit on their own.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+class SqliteStore:
+    """Keyed JSON documents in a SQLite table.
+
+    Each record is stored whole as JSON. The top-level fields named in
+    `columns` are mirrored into indexed columns, and list fields named in
+    `list_columns` into an indexed side table, so query() on them is an
+    index lookup instead of a scan. Writing one record touches one row.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        columns: Tuple[str, ...] = (),
+        list_columns: Tuple[str, ...] = (),
+    ):
+        self._conn = conn
+        self.table = table
+        self.columns = columns
+        self.list_columns = list_columns
+        self._create()
+
+    def _create(self):
+        cols = "".join(f", {c}" for c in self.columns)
+        with self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                f"(key TEXT PRIMARY KEY{cols}, data BLOB NOT NULL)"
+            )
+            for c in self.columns:
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_{c}_idx ON {self.table} ({c})"
+                )
+            for c in self.list_columns:
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.table}_{c} "
+                    f"(key TEXT NOT NULL, value TEXT NOT NULL)"
+                )
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_{c}_value_idx "
+                    f"ON {self.table}_{c} (value)"
+                )
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_{c}_key_idx "
+                    f"ON {self.table}_{c} (key)"
+                )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            f"SELECT data FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        return _json_loads(row[0]) if row else None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        with self._conn:
+            self._put(key, value)
+
+    def _put(self, key: str, value: Dict[str, Any]):
+        names = ", ".join(("key",) + self.columns + ("data",))
+        marks = ", ".join("?" * (len(self.columns) + 2))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in self.columns + ("data",))
+        self._conn.execute(
+            f"INSERT INTO {self.table} ({names}) VALUES ({marks}) "
+            f"ON CONFLICT(key) DO UPDATE SET {updates}",
+            (key, *(value.get(c) for c in self.columns), _json_dumps(value)),
+        )
+        for c in self.list_columns:
+            self._conn.execute(f"DELETE FROM {self.table}_{c} WHERE key = ?", (key,))
+            self._conn.executemany(
+                f"INSERT INTO {self.table}_{c} (key, value) VALUES (?, ?)",
+                [(key, v) for v in dict.fromkeys(value.get(c) or ())],
+            )
+
+    def delete(self, key: str):
+        with self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            for c in self.list_columns:
+                self._conn.execute(f"DELETE FROM {self.table}_{c} WHERE key = ?", (key,))
+
+    def query(
+        self,
+        any_of: Optional[Dict[str, Iterable[str]]] = None,
+        **filters: Any,
+    ) -> List[Dict[str, Any]]:
+        """Records matching all `filters` (equality on mirrored columns) and,
+        for each list column in `any_of`, containing at least one value."""
+        clauses = []
+        params: List[Any] = []
+        for c, value in filters.items():
+            clauses.append(f"{c} = ?")
+            params.append(value)
+        for c, values in (any_of or {}).items():
+            values = list(values)
+            clauses.append(
+                f"key IN (SELECT key FROM {self.table}_{c} "
+                f"WHERE value IN ({', '.join('?' * len(values))}))"
+            )
+            params.extend(values)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT data FROM {self.table}{where} ORDER BY rowid", params
+        )
+        return [_json_loads(row[0]) for row in rows]
+
+    def load(self) -> Dict[str, Any]:
+        rows = self._conn.execute(f"SELECT key, data FROM {self.table} ORDER BY rowid")
+        return {key: _json_loads(data) for key, data in rows}
+
+    def save(self, data: Dict[str, Any]):
+        with self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            for c in self.list_columns:
+                self._conn.execute(f"DELETE FROM {self.table}_{c}")
+            for key, value in data.items():
+                self._put(key, value)
+
+    def update(self, key: str, value: Any):
+        self.put(key, value)
+
+    def is_empty(self) -> bool:
+        return self._conn.execute(f"SELECT 1 FROM {self.table} LIMIT 1").fetchone() is None
+
+
+# ─── Knowledge Index ──────────────────────────────────────────────────────────
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _content_grams(text: str) -> Set[str]:
+    """Bigrams and trigrams of `text`, so two-character queries can be narrowed too."""
+    grams = _trigrams(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class _KnowledgeIndex:
+    """In-memory tag, category and content n-gram postings over knowledge entries.
+
+    search_text is a substring match, and any text containing the query
+    contains every trigram of it, so intersecting trigram postings yields
+    a small superset of the matches for the caller to verify; two-character
+    queries look up their bigram the same way. The index is brought up to
+    date against each newly loaded entries dict, only re-indexing entries
+    whose content, tags or category changed. The publish and expiry stamps
+    are kept parsed alongside, so scoring a query doesn't parse any dates.
+    """
+
+    def __init__(self):
+        self._source: Optional[Dict[str, Any]] = None
+        self._indexed: Dict[str, Tuple[str, Tuple[str, ...], str]] = {}
+        self.lowered: Dict[str, str] = {}  # entry_id -> lowercased content
+        # entry_id -> (published_ts or None if missing, expires_ts)
+        self.stamps: Dict[str, Tuple[Optional[float], float]] = {}
+        self._raw_stamps: Dict[str, Tuple[Any, Any]] = {}
+        self._order: Dict[str, int] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._categories: Dict[str, Set[str]] = {}
+
+    def sync(self, entries: Dict[str, Any]):
+        if entries is self._source:
+            return
+        for eid in self._indexed.keys() - entries.keys():
+            self._remove(eid)
+        for eid, edata in entries.items():
+            key = (
+                edata.get("content", ""),
+                tuple(edata.get("tags", ())),
+                edata.get("category", KnowledgeCategory.STRATEGY.value),
+            )
+            old = self._indexed.get(eid)
+            if old != key:
+                if old is not None:
+                    self._remove(eid)
+                self._add(eid, key)
+            raw = (edata.get("published_at"), edata.get("expires_at"))
+            if self._raw_stamps.get(eid) != raw:
+                self._raw_stamps[eid] = raw
+                published, expires = raw
+                self.stamps[eid] = (
+                    _stamp_ts(published, float("-inf")) if published else None,
+                    _stamp_ts(expires, float("inf")),
+                )
+        self._order = {eid: i for i, eid in enumerate(entries)}
+        self._source = entries
+
+    def _add(self, eid: str, key: Tuple[str, Tuple[str, ...], str]):
+        self._indexed[eid] = key
+        content, tags, category = key
+        lowered = self.lowered[eid] = content.lower()
+        for gram in _content_grams(lowered):
+            self._grams.setdefault(gram, set()).add(eid)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(eid)
+        self._categories.setdefault(category, set()).add(eid)
+
+    def _remove(self, eid: str):
+        _, tags, category = self._indexed.pop(eid)
+        lowered = self.lowered.pop(eid)
+        self.stamps.pop(eid, None)
+        self._raw_stamps.pop(eid, None)
+        for postings, keys in (
+            (self._grams, _content_grams(lowered)),
+            (self._tags, tags),
+            (self._categories, (category,)),
+        ):
+            for k in keys:
+                ids = postings.get(k)
+                if ids is not None:
+                    ids.discard(eid)
+                    if not ids:
+                        del postings[k]
+
+    def candidates(
+        self,
+        tags: Optional[List[str]],
+        search_text: Optional[str],
+        category: Optional[str] = None,
+    ) -> Optional[List[str]]:
+        """Entry IDs that may match, in store order, or None if the
+        filters can't narrow the search."""
+        found: Optional[Set[str]] = None
+        if category:
+            found = set(self._categories.get(category, ()))
+        if tags:
+            tagged = set().union(*(self._tags.get(t, ()) for t in tags))
+            found = tagged if found is None else found & tagged
+        if search_text and len(search_text) >= 2:
+            needle = search_text.lower()
+            grams = _trigrams(needle) if len(needle) >= 3 else {needle}
+            postings = sorted((self._grams.get(g, set()) for g in grams), key=len)
+            hits = postings[0].intersection(*postings[1:])
+            found = hits if found is None else found & hits
+        if found is None:
+            return None
+        return sorted(found, key=self._order.__getitem__)
 
 
 # ─── Agent Network ────────────────────────────────────────────────────────────
@@ -479,15 +1199,81 @@ class AgentNetwork:
         self.data_dir = data_dir
 
         # Stores
-        self._agents_store = JsonStore(os.path.join(data_dir, "agents.json"))
-        self._messages_store = JsonStore(os.path.join(data_dir, "messages.json"))
-        self._marketplace_store = JsonStore(os.path.join(data_dir, "marketplace.json"))
+        self._messages_dir = os.path.join(data_dir, "messages")
         self._knowledge_store = JsonStore(os.path.join(data_dir, "knowledge_store.json"))
-        self._orders_store = JsonStore(os.path.join(data_dir, "orders.json"))
+        self._db = _connect_sqlite(os.path.join(data_dir, "network.db"))
+        self._agents_store = SqliteStore(self._db, "agents", columns=("status",))
+        self._services_store = SqliteStore(
+            self._db, "services",
+            columns=("agent_id", "status"),
+            list_columns=("tags",),
+        )
+        self._orders_store = SqliteStore(
+            self._db, "orders",
+            columns=("service_id", "customer_agent_id", "provider_agent_id", "status"),
+        )
+        self._import_legacy_json(self._agents_store, "agents.json")
+        self._import_legacy_json(self._services_store, "marketplace.json", key="services")
+        self._import_legacy_json(self._orders_store, "orders.json")
 
         # Local state
         self._manifest: Optional[AgentManifest] = None
         self._message_handlers: Dict[str, Callable] = {}
+        self._inboxes: Dict[str, JsonlStore] = {}
+        self._knowledge_index = _KnowledgeIndex()
+        self._knowledge_queries: OrderedDict = OrderedDict()
+        self._knowledge_queries_source: Optional[Dict[str, Any]] = None
+        self._import_legacy_messages()
+
+    def _import_legacy_messages(self):
+        """Move pending messages from the pre-JSONL messages.json into the
+        per-recipient inboxes, once."""
+        path = os.path.join(self.data_dir, "messages.json")
+        if not os.path.exists(path):
+            return
+        # Locked so agents starting together don't deliver the messages twice
+        with _file_lock(path):
+            if not os.path.exists(path):
+                return  # Another agent sharing the data dir migrated it first
+            for agent_id, inbox in JsonStore(path).load().items():
+                if inbox:
+                    self._inbox_store(agent_id).extend(inbox)
+            os.replace(path, path + ".migrated")
+
+    def _import_legacy_json(self, store: SqliteStore, file_name: str, key: Optional[str] = None):
+        """Move a collection from its pre-SQLite JSON file into `store`, once."""
+        path = os.path.join(self.data_dir, file_name)
+        if not os.path.exists(path):
+            return
+        # Locked so agents starting together import it once; rows are only
+        # inserted, never cleared, so a late importer can't wipe the table
+        with _file_lock(path):
+            if not os.path.exists(path) or not store.is_empty():
+                return  # Another agent sharing the data dir migrated it first
+            data = JsonStore(path).load()
+            with _sqlite_transaction(self._db):
+                for record_key, value in (data.get(key, {}) if key else data).items():
+                    store._put(record_key, value)
+            os.replace(path, path + ".migrated")
+
+    def close(self):
+        """Close the network's database connection."""
+        self._db.close()
+
+    def _inbox_store(self, agent_id: str) -> JsonlStore:
+        """Get the JSONL inbox file for an agent.
+
+        Inboxes live at messages/<shard>/<agent_id>.jsonl, where the shard
+        is a stable hash of the agent ID, so no directory grows with the
+        size of the network.
+        """
+        store = self._inboxes.get(agent_id)
+        if store is None:
+            file_name = quote(agent_id, safe="") + ".jsonl"
+            shard = f"{zlib.crc32(agent_id.encode()) % INBOX_SHARDS:02x}"
+            store = JsonlStore(os.path.join(self._messages_dir, shard, file_name))
+            self._inboxes[agent_id] = store
+        return store
 
     # ─── Registration & Discovery ─────────────────────────────────────────
 
@@ -499,24 +1285,22 @@ class AgentNetwork:
             self._manifest = AgentManifest(identity=self.identity)
 
         # Update agents registry
-        data = self._agents_store.load()
-        data[self.identity.agent_id] = {
+        self._agents_store.put(self.identity.agent_id, {
             "manifest": self._manifest.to_dict(),
             "registered_at": datetime.utcnow().isoformat(),
             "last_heartbeat": datetime.utcnow().isoformat(),
             "status": "online",
-        }
-        self._agents_store.save(data)
+        })
         return self._manifest
 
     def heartbeat(self):
         """Send a liveness heartbeat."""
-        data = self._agents_store.load()
-        agent_data = data.get(self.identity.agent_id, {})
-        agent_data["last_heartbeat"] = datetime.utcnow().isoformat()
-        agent_data["status"] = "online"
-        data[self.identity.agent_id] = agent_data
-        self._agents_store.save(data)
+        agent_id = self.identity.agent_id
+        with _sqlite_transaction(self._db):
+            agent_data = self._agents_store.get(agent_id) or {}
+            agent_data["last_heartbeat"] = datetime.utcnow().isoformat()
+            agent_data["status"] = "online"
+            self._agents_store._put(agent_id, agent_data)
 
     def discover_agents(
         self,
@@ -540,6 +1324,8 @@ class AgentNetwork:
         """
         data = self._agents_store.load()
         manifests = []
+        now = time.time()
+        wanted_tags = frozenset(tags) if tags else None
 
         for agent_id, agent_data in data.items():
             if exclude_self and agent_id == self.identity.agent_id:
@@ -549,29 +1335,35 @@ class AgentNetwork:
             if not manifest_data:
                 continue
 
-            manifest = AgentManifest.from_dict(manifest_data)
-
-            # Filter by type
-            if agent_type and manifest.identity.agent_type != agent_type:
-                continue
+            # Filter on the stored dict before building the manifest
+            if agent_type:
+                identity_data = manifest_data.get("identity", {})
+                if identity_data.get("agent_type", "general") != agent_type:
+                    continue
 
             # Filter by tags
-            if tags:
-                agent_tags = set(manifest.all_tags)
-                if not set(tags) & agent_tags:
+            if wanted_tags:
+                agent_tags = manifest_data.get("tags")
+                if agent_tags is None:
+                    agent_tags = [
+                        t
+                        for g in manifest_data.get("capabilities", [])
+                        for a in g.get("actions", [])
+                        for t in a.get("tags", [])
+                    ]
+                if wanted_tags.isdisjoint(agent_tags):
                     continue
 
             # Filter by online status
             if online_only:
                 last_hb = agent_data.get("last_heartbeat", "")
                 try:
-                    hb_time = datetime.fromisoformat(last_hb)
-                    if (datetime.utcnow() - hb_time).total_seconds() > stale_threshold_hours * 3600:
+                    if now - _iso_to_ts(last_hb) > stale_threshold_hours * 3600:
                         continue
                 except (ValueError, TypeError):
                     continue
 
-            manifests.append(manifest)
+            manifests.append(AgentManifest.from_dict(manifest_data))
 
         return manifests
 
@@ -604,26 +1396,21 @@ class AgentNetwork:
         Returns:
             The message ID
         """
-        message.from_agent = self.identity.agent_id
-        if not message.to_agent:
-            raise ValueError("message.to_agent is required")
-
-        data = self._messages_store.load()
-
-        # Get or create inbox for recipient
-        inbox = data.get(message.to_agent, [])
-
-        # Enforce queue limit
-        if len(inbox) >= MAX_MESSAGE_QUEUE:
-            # Remove oldest expired or oldest messages
-            inbox = [m for m in inbox if not Message.from_dict(m).is_expired]
-            if len(inbox) >= MAX_MESSAGE_QUEUE:
-                inbox = inbox[-MAX_MESSAGE_QUEUE + 1:]
-
-        inbox.append(message.to_dict())
-        data[message.to_agent] = inbox
-        self._messages_store.save(data)
-        return message.message_id
+        return self._send_messages_bulk([message])[0]
+
+    def _send_messages_bulk(self, messages: List[Message]) -> List[str]:
+        """Send several messages with one append per recipient inbox."""
+        by_recipient: Dict[str, List[Dict[str, Any]]] = {}
+        for message in messages:
+            message.from_agent = self.identity.agent_id
+            if not message.to_agent:
+                raise ValueError("message.to_agent is required")
+            by_recipient.setdefault(message.to_agent, []).append(message.to_dict())
+
+        # Append-only: the queue limit is enforced when the inbox is read
+        for to_agent, records in by_recipient.items():
+            self._inbox_store(to_agent).extend(records)
+        return [m.message_id for m in messages]
 
     def broadcast(self, subject: str, body: Dict[str, Any]) -> List[str]:
         """Broadcast a message to all known agents.
@@ -632,17 +1419,15 @@ class AgentNetwork:
             List of message IDs sent
         """
         agents = self.discover_agents(exclude_self=True)
-        message_ids = []
-        for manifest in agents:
-            msg = Message(
+        return self._send_messages_bulk([
+            Message(
                 to_agent=manifest.identity.agent_id,
                 message_type=MessageType.BROADCAST.value,
                 subject=subject,
                 body=body,
             )
-            mid = self.send_message(msg)
-            message_ids.append(mid)
-        return message_ids
+            for manifest in agents
+        ])
 
     def check_messages(
         self,
@@ -660,33 +1445,43 @@ class AgentNetwork:
         Returns:
             List of messages
         """
-        data = self._messages_store.load()
-        inbox = data.get(self.identity.agent_id, [])
-
-        messages = []
-        remaining = []
-
-        for msg_data in inbox:
-            msg = Message.from_dict(msg_data)
-
-            if msg.is_expired:
-                continue
-
-            if message_type and msg.message_type != message_type:
-                if drain:
-                    remaining.append(msg_data)
-                continue
+        store = self._inbox_store(self.identity.agent_id)
+        # Draining rewrites the inbox, so hold the lock to keep senders from
+        # appending between our read and the rewrite
+        with _file_lock(store.file_path) if drain else nullcontext():
+            inbox = store.read_all()
+            now = time.time()
+
+            # Enforce queue limit: drop expired, then keep the newest messages
+            if len(inbox) > MAX_MESSAGE_QUEUE:
+                _drop_expired(inbox, now)
+                del inbox[:-MAX_MESSAGE_QUEUE]
+
+            messages = []
+            had_messages = bool(inbox)
+            write = 0
+
+            # Filter on the raw dicts; only matching messages become Message
+            # objects. Messages left in the inbox are compacted in place.
+            for msg_data in inbox:
+                if _is_expired_dict(msg_data, now):
+                    continue
 
-            if from_agent and msg.from_agent != from_agent:
-                if drain:
-                    remaining.append(msg_data)
-                continue
+                if (
+                    (message_type and msg_data.get("message_type", MessageType.REQUEST.value) != message_type)
+                    or (from_agent and msg_data.get("from_agent", "") != from_agent)
+                ):
+                    inbox[write] = msg_data
+                    write += 1
+                    continue
 
-            messages.append(msg)
+                # The record belongs to the inbox's parse cache; give the
+                # Message its own copy of the body
+                messages.append(Message.from_dict(_json_copy(msg_data)))
 
-        if drain:
-            data[self.identity.agent_id] = remaining
-            self._messages_store.save(data)
+            if drain and had_messages:
+                del inbox[write:]
+                store.rewrite(inbox)
 
         return messages
 
@@ -721,11 +1516,7 @@ class AgentNetwork:
             The published service with ID assigned
         """
         service.agent_id = self.identity.agent_id
-        data = self._marketplace_store.load()
-        services = data.get("services", {})
-        services[service.service_id] = service.to_dict()
-        data["services"] = services
-        self._marketplace_store.save(data)
+        self._services_store.put(service.service_id, service.to_dict())
         return service
 
     def list_services(
@@ -746,24 +1537,18 @@ class AgentNetwork:
         Returns:
             List of matching ServiceListings
         """
-        data = self._marketplace_store.load()
-        services = data.get("services", {})
+        filters: Dict[str, Any] = {}
+        if status:
+            filters["status"] = status
+        if agent_id:
+            filters["agent_id"] = agent_id
+        any_of = {"tags": tags} if tags else None
         results = []
 
-        for sid, sdata in services.items():
-            listing = ServiceListing.from_dict(sdata)
-
-            if status and listing.status != status:
-                continue
-            if agent_id and listing.agent_id != agent_id:
-                continue
-            if max_price is not None and listing.price > max_price:
+        for sdata in self._services_store.query(any_of, **filters):
+            if max_price is not None and sdata.get("price", 0.0) > max_price:
                 continue
-            if tags:
-                if not set(tags) & set(listing.tags):
-                    continue
-
-            results.append(listing)
+            results.append(ServiceListing.from_dict(sdata))
 
         return results
 
@@ -782,9 +1567,7 @@ class AgentNetwork:
             The created order
         """
         # Look up the service
-        data = self._marketplace_store.load()
-        services = data.get("services", {})
-        sdata = services.get(service_id)
+        sdata = self._services_store.get(service_id)
         if not sdata:
             raise ValueError(f"Service '{service_id}' not found")
 
@@ -799,9 +1582,7 @@ class AgentNetwork:
         )
 
         # Save order
-        orders_data = self._orders_store.load()
-        orders_data[order.order_id] = order.to_dict()
-        self._orders_store.save(orders_data)
+        self._orders_store.put(order.order_id, order.to_dict())
 
         # Notify provider via message
         self.send_message(Message(
@@ -833,37 +1614,33 @@ class AgentNetwork:
         Returns:
             The updated order
         """
-        orders_data = self._orders_store.load()
-        odata = orders_data.get(order_id)
-        if not odata:
-            raise ValueError(f"Order '{order_id}' not found")
+        # Order and service stats are updated in one transaction
+        with _sqlite_transaction(self._db):
+            odata = self._orders_store.get(order_id)
+            if not odata:
+                raise ValueError(f"Order '{order_id}' not found")
 
-        order = ServiceOrder.from_dict(odata)
+            order = ServiceOrder.from_dict(odata)
 
-        if error:
-            order.status = OrderStatus.FAILED.value
-            order.error = error
-        else:
-            order.status = OrderStatus.COMPLETED.value
-            order.result = result
-
-        order.completed_at = datetime.utcnow().isoformat()
-
-        # Update service stats
-        marketplace_data = self._marketplace_store.load()
-        services = marketplace_data.get("services", {})
-        sdata = services.get(order.service_id, {})
-        if sdata:
-            sdata["total_orders"] = sdata.get("total_orders", 0) + 1
-            if order.status == OrderStatus.COMPLETED.value:
-                sdata["total_revenue"] = sdata.get("total_revenue", 0) + order.price_paid
-            services[order.service_id] = sdata
-            marketplace_data["services"] = services
-            self._marketplace_store.save(marketplace_data)
-
-        # Save updated order
-        orders_data[order_id] = order.to_dict()
-        self._orders_store.save(orders_data)
+            if error:
+                order.status = OrderStatus.FAILED.value
+                order.error = error
+            else:
+                order.status = OrderStatus.COMPLETED.value
+                order.result = result
+
+            order.completed_at = datetime.utcnow().isoformat()
+
+            # Update service stats
+            sdata = self._services_store.get(order.service_id)
+            if sdata:
+                sdata["total_orders"] = sdata.get("total_orders", 0) + 1
+                if order.status == OrderStatus.COMPLETED.value:
+                    sdata["total_revenue"] = sdata.get("total_revenue", 0) + order.price_paid
+                self._services_store._put(order.service_id, sdata)
+
+            # Save updated order
+            self._orders_store._put(order_id, order.to_dict())
 
         # Notify customer
         self.send_message(Message(
@@ -882,8 +1659,7 @@ class AgentNetwork:
 
     def get_order(self, order_id: str) -> Optional[ServiceOrder]:
         """Get an order by ID."""
-        orders_data = self._orders_store.load()
-        odata = orders_data.get(order_id)
+        odata = self._orders_store.get(order_id)
         if not odata:
             return None
         return ServiceOrder.from_dict(odata)
@@ -902,20 +1678,15 @@ class AgentNetwork:
         Returns:
             List of matching orders
         """
-        orders_data = self._orders_store.load()
-        results = []
-
-        for oid, odata in orders_data.items():
-            order = ServiceOrder.from_dict(odata)
-            if as_customer and order.customer_agent_id != self.identity.agent_id:
-                continue
-            if not as_customer and order.provider_agent_id != self.identity.agent_id:
-                continue
-            if status and order.status != status:
-                continue
-            results.append(order)
+        filters: Dict[str, Any] = {}
+        if as_customer:
+            filters["customer_agent_id"] = self.identity.agent_id
+        else:
+            filters["provider_agent_id"] = self.identity.agent_id
+        if status:
+            filters["status"] = status
 
-        return results
+        return [ServiceOrder.from_dict(odata) for odata in self._orders_store.query(**filters)]
 
     # ─── Knowledge Sharing ────────────────────────────────────────────────
 
@@ -929,20 +1700,26 @@ class AgentNetwork:
             The published entry
         """
         entry.published_by = self.identity.agent_id
-        data = self._knowledge_store.load()
-        entries = data.get("entries", {})
 
-        # Check for duplicate (same content hash)
-        if entry.entry_id in entries:
-            existing = entries[entry.entry_id]
-            # Merge: keep higher confidence, newer timestamp
-            if entry.confidence > existing.get("confidence", 0):
+        # A duplicate that wouldn't replace the stored entry needs no write.
+        # The load is served from the store's cache while the file is unchanged.
+        existing = self._knowledge_store.load().get("entries", {}).get(entry.entry_id)
+        if existing is not None and entry.confidence <= existing.get("confidence", 0):
+            return entry
+
+        def merge(data: Dict[str, Any]):
+            entries = data.setdefault("entries", {})
+
+            # Check for duplicate (same content hash)
+            if entry.entry_id in entries:
+                existing = entries[entry.entry_id]
+                # Merge: keep higher confidence, newer timestamp
+                if entry.confidence > existing.get("confidence", 0):
+                    entries[entry.entry_id] = entry.to_dict()
+            else:
                 entries[entry.entry_id] = entry.to_dict()
-        else:
-            entries[entry.entry_id] = entry.to_dict()
 
-        data["entries"] = entries
-        self._knowledge_store.save(data)
+        self._knowledge_store._locked_update(merge)
         return entry
 
     def query_knowledge(
@@ -967,27 +1744,67 @@ class AgentNetwork:
         """
         data = self._knowledge_store.load()
         entries = data.get("entries", {})
-        results = []
 
-        for eid, edata in entries.items():
-            entry = KnowledgeEntry.from_dict(edata)
+        # Repeat queries against an unchanged store are served from cache.
+        # Any save or reload of the store yields a new entries dict.
+        if isinstance(category, Enum):
+            category = category.value  # Index keys are the stored strings
+
+        if entries is not self._knowledge_queries_source:
+            self._knowledge_queries.clear()
+            self._knowledge_queries_source = entries
+        cache_key = (category, tuple(sorted(tags)) if tags else None,
+                     min_confidence, search_text, limit)
+        cached = self._knowledge_queries.get(cache_key)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < KNOWLEDGE_QUERY_CACHE_TTL:
+            self._knowledge_queries.move_to_end(cache_key)
+            return [_detached_entry(e) for e in cached[1]]
+
+        # Narrow to entries in the category, sharing a tag and containing
+        # the text's trigrams
+        self._knowledge_index.sync(entries)
+        candidate_ids = self._knowledge_index.candidates(tags, search_text, category)
+        needle = search_text.lower() if search_text else None
+        wanted_tags = frozenset(tags) if tags else None
+        lowered = self._knowledge_index.lowered
+        stamps = self._knowledge_index.stamps
+        now_ts = time.time()
+
+        def scored_matches() -> Iterable[Tuple[float, str]]:
+            for eid in entries if candidate_ids is None else candidate_ids:
+                edata = entries[eid]
+
+                # Filter and score the raw dicts; entries are only built
+                # for the winners
+                if category and edata.get("category", KnowledgeCategory.STRATEGY.value) != category:
+                    continue
+                if wanted_tags and wanted_tags.isdisjoint(edata.get("tags", ())):
+                    continue
+                if needle and needle not in lowered[eid]:
+                    continue
 
-            if entry.is_expired:
-                continue
-            if entry.relevance_score < min_confidence:
-                continue
-            if category and entry.category != category:
-                continue
-            if tags and not set(tags) & set(entry.tags):
-                continue
-            if search_text and search_text.lower() not in entry.content.lower():
-                continue
+                published_ts, expires_ts = stamps[eid]
+                if now_ts > expires_ts:
+                    continue
+
+                score = _knowledge_relevance(
+                    edata, now_ts, now_ts if published_ts is None else published_ts
+                )
+                if score < min_confidence:
+                    continue
 
-            results.append(entry)
+                yield score, eid
 
-        # Sort by relevance score
-        results.sort(key=lambda e: e.relevance_score, reverse=True)
-        return results[:limit]
+        # Top `limit` by relevance score; ties keep store order
+        top = heapq.nlargest(limit, scored_matches(), key=itemgetter(0))
+        results = [KnowledgeEntry.from_dict(entries[eid]) for _, eid in top]
+
+        self._knowledge_queries[cache_key] = (now, results)
+        self._knowledge_queries.move_to_end(cache_key)
+        if len(self._knowledge_queries) > KNOWLEDGE_QUERY_CACHE_SIZE:
+            self._knowledge_queries.popitem(last=False)
+        return [_detached_entry(e) for e in results]
 
     def endorse_knowledge(self, entry_id: str) -> Optional[KnowledgeEntry]:
         """Endorse a knowledge entry (increase its confidence).
@@ -998,22 +1815,22 @@ class AgentNetwork:
         Returns:
             The updated entry, or None if not found
         """
-        data = self._knowledge_store.load()
-        entries = data.get("entries", {})
-        edata = entries.get(entry_id)
+        def endorse(data: Dict[str, Any]) -> Any:
+            entries = data.get("entries", {})
+            edata = entries.get(entry_id)
 
-        if not edata:
-            return None
+            if not edata:
+                return _Unchanged()
 
-        entry = KnowledgeEntry.from_dict(edata)
-        if self.identity.agent_id not in entry.endorsements:
+            entry = KnowledgeEntry.from_dict(edata)
+            if self.identity.agent_id in entry.endorsements:
+                return _Unchanged(entry)
             entry.endorsements.append(self.identity.agent_id)
             entry.confidence = min(1.0, entry.confidence + 0.05)
             entries[entry_id] = entry.to_dict()
-            data["entries"] = entries
-            self._knowledge_store.save(data)
+            return entry
 
-        return entry
+        return self._knowledge_store._locked_update(endorse)
 
     def dispute_knowledge(self, entry_id: str, reason: str = "") -> Optional[KnowledgeEntry]:
         """Dispute a knowledge entry (decrease its confidence).
@@ -1025,23 +1842,23 @@ class AgentNetwork:
         Returns:
             The updated entry, or None if not found
         """
-        data = self._knowledge_store.load()
-        entries = data.get("entries", {})
-        edata = entries.get(entry_id)
+        def dispute(data: Dict[str, Any]) -> Any:
+            entries = data.get("entries", {})
+            edata = entries.get(entry_id)
 
-        if not edata:
-            return None
+            if not edata:
+                return _Unchanged()
 
-        entry = KnowledgeEntry.from_dict(edata)
-        dispute_record = f"{self.identity.agent_id}:{reason}" if reason else self.identity.agent_id
-        if self.identity.agent_id not in [d.split(":")[0] for d in entry.disputes]:
+            entry = KnowledgeEntry.from_dict(edata)
+            if self.identity.agent_id in [d.split(":")[0] for d in entry.disputes]:
+                return _Unchanged(entry)
+            dispute_record = f"{self.identity.agent_id}:{reason}" if reason else self.identity.agent_id
             entry.disputes.append(dispute_record)
             entry.confidence = max(0, entry.confidence - 0.10)
             entries[entry_id] = entry.to_dict()
-            data["entries"] = entries
-            self._knowledge_store.save(data)
+            return entry
 
-        return entry
+        return self._knowledge_store._locked_update(dispute)
 
     # ─── Utility ──────────────────────────────────────────────────────────
 
@@ -1050,7 +1867,9 @@ class AgentNetwork:
         services = self.list_services(agent_id=self.identity.agent_id)
         customer_orders = self.my_orders(as_customer=True)
         provider_orders = self.my_orders(as_customer=False)
-        messages = self.check_messages(drain=False)
+        now = time.time()
+        inbox = self._inbox_store(self.identity.agent_id).read_all()
+        pending = sum(1 for m in inbox if not _is_expired_dict(m, now))
 
         total_revenue = sum(s.total_revenue for s in services)
         total_spent = sum(
@@ -1066,25 +1885,34 @@ class AgentNetwork:
             "total_spent": total_spent,
             "orders_placed": len(customer_orders),
             "orders_received": len(provider_orders),
-            "pending_messages": len(messages),
+            "pending_messages": min(pending, MAX_MESSAGE_QUEUE),
         }
 
     def cleanup_expired(self):
         """Remove expired messages and knowledge entries."""
         # Clean messages
-        msg_data = self._messages_store.load()
-        for agent_id, inbox in msg_data.items():
-            msg_data[agent_id] = [
-                m for m in inbox
-                if not Message.from_dict(m).is_expired
-            ]
-        self._messages_store.save(msg_data)
+        now = time.time()
+        shards = os.listdir(self._messages_dir) if os.path.isdir(self._messages_dir) else []
+        for shard in shards:
+            shard_dir = os.path.join(self._messages_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for file_name in os.listdir(shard_dir):
+                if not file_name.endswith(".jsonl"):
+                    continue
+                store = JsonlStore(os.path.join(shard_dir, file_name))
+                # Only take the lock and rewrite when something expired
+                if any(_is_expired_dict(m, now) for m in store.read_all()):
+                    store._locked_update(lambda inbox: _drop_expired(inbox, now))
 
         # Clean knowledge
-        k_data = self._knowledge_store.load()
-        entries = k_data.get("entries", {})
-        k_data["entries"] = {
-            eid: edata for eid, edata in entries.items()
-            if not KnowledgeEntry.from_dict(edata).is_expired
-        }
-        self._knowledge_store.save(k_data)
+        entries = self._knowledge_store.load().get("entries", {})
+        if not any(_knowledge_expired(edata, now) for edata in entries.values()):
+            return
+
+        def prune(k_data: Dict[str, Any]):
+            entries = k_data.get("entries", {})
+            for eid in [eid for eid, edata in entries.items() if _knowledge_expired(edata, now)]:
+                del entries[eid]
+
+        self._knowledge_store._locked_update(prune)
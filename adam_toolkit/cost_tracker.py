@@ -6,12 +6,16 @@ Essential for any agent that needs to manage a finite balance.
 
 from __future__ import annotations
 
+import heapq
 import time
+from bisect import bisect_left
+from collections import defaultdict
 from dataclasses import dataclass, field
+from operator import attrgetter, itemgetter
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class CostEntry:
     """A single cost record."""
 
@@ -22,7 +26,7 @@ class CostEntry:
     description: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class RevenueEntry:
     """A single revenue record."""
 
@@ -33,6 +37,66 @@ class RevenueEntry:
     description: str = ""
 
 
+_timestamp = attrgetter("timestamp")
+
+
+def _ranked(breakdown: dict[str, float], top_n: Optional[int]) -> dict[str, float]:
+    """Largest amounts first; only the `top_n` largest when given."""
+    if top_n is not None and top_n < len(breakdown):
+        return dict(heapq.nlargest(top_n, breakdown.items(), key=itemgetter(1)))
+    return dict(sorted(breakdown.items(), key=itemgetter(1), reverse=True))
+
+
+def _in_order(entries: list, timestamp: Optional[float]) -> float:
+    """`timestamp` (default now), but no earlier than the last entry's.
+
+    The rolling windows and bisect cutoffs rely on entries being
+    appended in time order; a stale or out-of-order reading would
+    otherwise corrupt them.
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    if entries and timestamp < entries[-1].timestamp:
+        return entries[-1].timestamp
+    return timestamp
+
+
+class _RollingWindow:
+    """Running sum of the entries recorded in the last `hours`.
+
+    Entries are appended in time order, so the window start only moves
+    forward: each entry is added once and dropped once, instead of the
+    whole history being filtered on every read.
+    """
+
+    def __init__(self, entries: list, hours: float):
+        self._entries = entries
+        self.hours = hours
+        self.start = 0  # Index of the oldest entry inside the window
+        self._end = 0  # Entries before this index are counted in total
+        self.total = 0.0
+
+    def advance(self, now: float) -> None:
+        entries = self._entries
+        while self._end < len(entries):
+            self.total += entries[self._end].amount
+            self._end += 1
+        cutoff = now - self.hours * 3600
+        while self.start < self._end and entries[self.start].timestamp < cutoff:
+            self.total -= entries[self.start].amount
+            self.start += 1
+        if self.start == self._end:
+            self.total = 0.0  # Don't carry float residue across empty windows
+
+    @property
+    def count(self) -> int:
+        return self._end - self.start
+
+    @property
+    def first_timestamp(self) -> float:
+        return self._entries[self.start].timestamp
+
+
 class CostTracker:
     """Tracks costs, revenue, and calculates financial metrics.
 
@@ -43,6 +107,8 @@ class CostTracker:
         print(f"Runway: {tracker.runway_hours:.0f} hours")
     """
 
+    SUMMARY_TOP_N = 10  # Breakdown rows included in summary()
+
     def __init__(
         self,
         balance: float = 0.0,
@@ -58,6 +124,13 @@ class CostTracker:
         self._revenues: list[RevenueEntry] = []
         self._start_time = time.time()
 
+        # Running all-time aggregates, updated as entries are recorded
+        self._total_costs = 0.0
+        self._total_revenue = 0.0
+        self._category_totals: defaultdict[str, float] = defaultdict(float)
+        self._source_totals: defaultdict[str, float] = defaultdict(float)
+        self._windows: dict[tuple[int, float], _RollingWindow] = {}
+
     def record_cost(
         self,
         category: str,
@@ -65,15 +138,24 @@ class CostTracker:
         *,
         metadata: Optional[dict] = None,
         description: str = "",
+        timestamp: Optional[float] = None,
     ) -> CostEntry:
-        """Record an expenditure."""
+        """Record an expenditure.
+
+        `timestamp` defaults to now; callers recording several things at
+        once can pass one shared reading. A timestamp before the latest
+        entry is clamped to it, keeping entries in time order.
+        """
         entry = CostEntry(
             category=category,
             amount=amount,
+            timestamp=_in_order(self._costs, timestamp),
             metadata=metadata or {},
             description=description,
         )
         self._costs.append(entry)
+        self._total_costs += amount
+        self._category_totals[category] += amount
         self.balance -= amount
         return entry
 
@@ -84,35 +166,51 @@ class CostTracker:
         *,
         metadata: Optional[dict] = None,
         description: str = "",
+        timestamp: Optional[float] = None,
     ) -> RevenueEntry:
-        """Record income."""
+        """Record income. `timestamp` works as in record_cost."""
         entry = RevenueEntry(
             source=source,
             amount=amount,
+            timestamp=_in_order(self._revenues, timestamp),
             metadata=metadata or {},
             description=description,
         )
         self._revenues.append(entry)
+        self._total_revenue += amount
+        self._source_totals[source] += amount
         self.balance += amount
         return entry
 
     def _recent_entries(
         self, entries: list, hours: Optional[float] = None
     ) -> list:
-        """Filter entries to recent window."""
+        """Entries inside the recent window, oldest first."""
         window = hours or self.history_window_hours
         cutoff = time.time() - (window * 3600)
-        return [e for e in entries if e.timestamp >= cutoff]
+        # Entries are appended in time order, so the window start is found
+        # by binary search and only the recent entries are copied.
+        start = bisect_left(entries, cutoff, key=_timestamp)
+        return entries[start:]
+
+    def _window(self, entries: list, hours: float, now: float) -> _RollingWindow:
+        """Rolling window over `entries`, advanced to `now`."""
+        key = (id(entries), hours)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _RollingWindow(entries, hours)
+        window.advance(now)
+        return window
 
     @property
     def total_costs(self) -> float:
         """Total costs ever recorded."""
-        return sum(e.amount for e in self._costs)
+        return self._total_costs
 
     @property
     def total_revenue(self) -> float:
         """Total revenue ever recorded."""
-        return sum(e.amount for e in self._revenues)
+        return self._total_revenue
 
     @property
     def net_profit(self) -> float:
@@ -122,38 +220,38 @@ class CostTracker:
     @property
     def daily_spend(self) -> float:
         """Spending in the last 24 hours."""
-        recent = self._recent_entries(self._costs, 24.0)
-        return sum(e.amount for e in recent)
+        return self._window(self._costs, 24.0, time.time()).total
 
     @property
     def daily_revenue(self) -> float:
         """Revenue in the last 24 hours."""
-        recent = self._recent_entries(self._revenues, 24.0)
-        return sum(e.amount for e in recent)
+        return self._window(self._revenues, 24.0, time.time()).total
 
     @property
     def hourly_spend(self) -> float:
         """Average hourly spending based on recent history."""
-        recent = self._recent_entries(self._costs)
-        if not recent:
+        now = time.time()
+        recent = self._window(self._costs, self.history_window_hours, now)
+        if not recent.count:
             return self.base_burn_rate_hourly
 
         hours_elapsed = max(
-            (time.time() - recent[0].timestamp) / 3600, 0.1
+            (now - recent.first_timestamp) / 3600, 0.1
         )
-        return sum(e.amount for e in recent) / hours_elapsed
+        return recent.total / hours_elapsed
 
     @property
     def hourly_revenue(self) -> float:
         """Average hourly revenue based on recent history."""
-        recent = self._recent_entries(self._revenues)
-        if not recent:
+        now = time.time()
+        recent = self._window(self._revenues, self.history_window_hours, now)
+        if not recent.count:
             return 0.0
 
         hours_elapsed = max(
-            (time.time() - recent[0].timestamp) / 3600, 0.1
+            (now - recent.first_timestamp) / 3600, 0.1
         )
-        return sum(e.amount for e in recent) / hours_elapsed
+        return recent.total / hours_elapsed
 
     @property
     def effective_burn_rate(self) -> float:
@@ -173,26 +271,35 @@ class CostTracker:
         """Estimated days until balance reaches zero."""
         return self.runway_hours / 24.0
 
-    def costs_by_category(self, hours: Optional[float] = None) -> dict[str, float]:
-        """Break down costs by category."""
-        entries = self._recent_entries(self._costs, hours) if hours else self._costs
-        breakdown: dict[str, float] = {}
-        for e in entries:
-            breakdown[e.category] = breakdown.get(e.category, 0.0) + e.amount
-        return dict(sorted(breakdown.items(), key=lambda x: -x[1]))
-
-    def revenue_by_source(self, hours: Optional[float] = None) -> dict[str, float]:
-        """Break down revenue by source."""
-        entries = (
-            self._recent_entries(self._revenues, hours) if hours else self._revenues
-        )
-        breakdown: dict[str, float] = {}
-        for e in entries:
-            breakdown[e.source] = breakdown.get(e.source, 0.0) + e.amount
-        return dict(sorted(breakdown.items(), key=lambda x: -x[1]))
+    def costs_by_category(
+        self, hours: Optional[float] = None, top_n: Optional[int] = None
+    ) -> dict[str, float]:
+        """Break down costs by category, optionally only the `top_n` largest."""
+        if not hours:
+            breakdown = self._category_totals
+        else:
+            breakdown = defaultdict(float)
+            for e in self._recent_entries(self._costs, hours):
+                breakdown[e.category] += e.amount
+        return _ranked(breakdown, top_n)
+
+    def revenue_by_source(
+        self, hours: Optional[float] = None, top_n: Optional[int] = None
+    ) -> dict[str, float]:
+        """Break down revenue by source, optionally only the `top_n` largest."""
+        if not hours:
+            breakdown = self._source_totals
+        else:
+            breakdown = defaultdict(float)
+            for e in self._recent_entries(self._revenues, hours):
+                breakdown[e.source] += e.amount
+        return _ranked(breakdown, top_n)
 
     def summary(self) -> dict:
-        """Get a comprehensive financial summary."""
+        """Get a comprehensive financial summary.
+
+        The breakdowns list the SUMMARY_TOP_N largest categories and sources.
+        """
         return {
             "balance": round(self.balance, 6),
             "total_costs": round(self.total_costs, 6),
@@ -205,6 +312,6 @@ class CostTracker:
             "runway_days": round(self.runway_days, 2),
             "cost_entries": len(self._costs),
             "revenue_entries": len(self._revenues),
-            "costs_by_category": self.costs_by_category(),
-            "revenue_by_source": self.revenue_by_source(),
+            "costs_by_category": self.costs_by_category(top_n=self.SUMMARY_TOP_N),
+            "revenue_by_source": self.revenue_by_source(top_n=self.SUMMARY_TOP_N),
         }
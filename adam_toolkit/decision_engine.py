@@ -7,6 +7,7 @@ financial situation.
 
 from __future__ import annotations
 
+import heapq
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
@@ -23,7 +24,7 @@ class RiskTolerance(Enum):
     DESPERATE = "desperate"  # Low balance, needs revenue now
 
 
-@dataclass
+@dataclass(slots=True)
 class Decision:
     """Result of a decision evaluation."""
 
@@ -40,6 +41,62 @@ class Decision:
         return self.expected_profit > 0
 
 
+# Per-tolerance decision policies. All share one positional signature and
+# return (execute, reason).
+
+
+def _decide_desperate(
+    total_ev, expected_profit, estimated_revenue, confidence, risk_score, strategic_value, reversible
+) -> tuple[bool, str]:
+    # Take any positive EV action, even risky ones
+    if total_ev > 0:
+        return True, f"Desperate mode: positive EV ${total_ev:.4f}"
+    if estimated_revenue > 0 and confidence > 0.3:
+        return True, f"Desperate mode: revenue possible (conf={confidence:.0%})"
+    return False, f"Even in desperate mode, EV too negative (${total_ev:.4f})"
+
+
+def _decide_conservative(
+    total_ev, expected_profit, estimated_revenue, confidence, risk_score, strategic_value, reversible
+) -> tuple[bool, str]:
+    # Only high-confidence, clearly profitable actions
+    if expected_profit > 0 and confidence > 0.7:
+        return True, f"Conservative: high-conf profitable (${expected_profit:.4f}, {confidence:.0%})"
+    if expected_profit > 0 and risk_score < 0.1:
+        return True, f"Conservative: low-risk profitable (risk={risk_score:.2f})"
+    return False, "Conservative: insufficient confidence or profit"
+
+
+def _decide_moderate(
+    total_ev, expected_profit, estimated_revenue, confidence, risk_score, strategic_value, reversible
+) -> tuple[bool, str]:
+    # Balanced approach
+    if total_ev > 0 and confidence > 0.4:
+        return True, "Moderate: positive EV with decent confidence"
+    if strategic_value > 0.5 and risk_score < 0.3:
+        return True, "Moderate: high strategic value, acceptable risk"
+    return False, "Moderate: EV or confidence too low"
+
+
+def _decide_aggressive(
+    total_ev, expected_profit, estimated_revenue, confidence, risk_score, strategic_value, reversible
+) -> tuple[bool, str]:
+    # Take calculated risks
+    if total_ev > -0.01:  # Accept slightly negative EV for learning
+        return True, f"Aggressive: acceptable EV (${total_ev:.4f})"
+    if not reversible and risk_score > 0.5:
+        return False, "Aggressive: too risky for irreversible action"
+    return False, f"Aggressive: EV too negative (${total_ev:.4f})"
+
+
+_POLICIES = {
+    RiskTolerance.DESPERATE: _decide_desperate,
+    RiskTolerance.CONSERVATIVE: _decide_conservative,
+    RiskTolerance.MODERATE: _decide_moderate,
+    RiskTolerance.AGGRESSIVE: _decide_aggressive,
+}
+
+
 class DecisionEngine:
     """Evaluates actions based on cost-benefit analysis.
 
@@ -73,10 +130,12 @@ class DecisionEngine:
     @property
     def risk_tolerance(self) -> RiskTolerance:
         """Auto-determine risk tolerance from financial situation."""
+        return self._tolerance_for(self.tracker.runway_hours)
+
+    def _tolerance_for(self, runway: float) -> RiskTolerance:
         if self._manual_risk:
             return self._manual_risk
 
-        runway = self.tracker.runway_hours
         if runway < self.PANIC_THRESHOLD:
             return RiskTolerance.DESPERATE
         elif runway < self.SURVIVAL_THRESHOLD:
@@ -111,6 +170,41 @@ class DecisionEngine:
         Returns:
             Decision with recommendation and analysis
         """
+        burn, balance, tolerance = self._snapshot()
+        return self._evaluate(
+            action,
+            estimated_cost,
+            estimated_revenue,
+            confidence,
+            time_hours=time_hours,
+            strategic_value=strategic_value,
+            reversible=reversible,
+            burn=burn,
+            balance=balance,
+            tolerance=tolerance,
+        )
+
+    def _snapshot(self) -> tuple[float, float, RiskTolerance]:
+        """Read the tracker state a decision depends on: (burn, balance, tolerance)."""
+        burn = self.tracker.effective_burn_rate
+        balance = self.tracker.balance
+        runway = balance / burn if burn > 0 else float("inf")
+        return burn, balance, self._tolerance_for(runway)
+
+    def _evaluate(
+        self,
+        action: str,
+        estimated_cost: float,
+        estimated_revenue: float = 0.0,
+        confidence: float = 0.5,
+        *,
+        time_hours: float = 0.0,
+        strategic_value: float = 0.0,
+        reversible: bool = True,
+        burn: float,
+        balance: float,
+        tolerance: RiskTolerance,
+    ) -> Decision:
         # Calculate expected value
         expected_revenue = estimated_revenue * confidence
         expected_cost = estimated_cost  # Costs are certain
@@ -121,13 +215,12 @@ class DecisionEngine:
         expected_profit -= time_cost
 
         # Risk score: higher when cost is large relative to balance
-        balance = max(self.tracker.balance, 0.001)
+        balance = max(balance, 0.001)
         cost_ratio = estimated_cost / balance
         risk_score = min(cost_ratio * (1 - confidence), 1.0)
 
         # Runway impact
         runway_impact = 0.0
-        burn = self.tracker.effective_burn_rate
         if burn > 0:
             runway_impact = -estimated_cost / burn  # Hours lost from cost
             if expected_revenue > 0:
@@ -137,54 +230,11 @@ class DecisionEngine:
         strategic_bonus = strategic_value * 0.05  # Strategic value worth up to $0.05
 
         # Decision logic based on risk tolerance
-        tolerance = self.risk_tolerance
-        execute = False
-        reason = ""
-
         total_ev = expected_profit + strategic_bonus
-
-        if tolerance == RiskTolerance.DESPERATE:
-            # Take any positive EV action, even risky ones
-            if total_ev > 0:
-                execute = True
-                reason = f"Desperate mode: positive EV ${total_ev:.4f}"
-            elif estimated_revenue > 0 and confidence > 0.3:
-                execute = True
-                reason = f"Desperate mode: revenue possible (conf={confidence:.0%})"
-            else:
-                reason = f"Even in desperate mode, EV too negative (${total_ev:.4f})"
-
-        elif tolerance == RiskTolerance.CONSERVATIVE:
-            # Only high-confidence, clearly profitable actions
-            if expected_profit > 0 and confidence > 0.7:
-                execute = True
-                reason = f"Conservative: high-conf profitable (${expected_profit:.4f}, {confidence:.0%})"
-            elif expected_profit > 0 and risk_score < 0.1:
-                execute = True
-                reason = f"Conservative: low-risk profitable (risk={risk_score:.2f})"
-            else:
-                reason = f"Conservative: insufficient confidence or profit"
-
-        elif tolerance == RiskTolerance.MODERATE:
-            # Balanced approach
-            if total_ev > 0 and confidence > 0.4:
-                execute = True
-                reason = f"Moderate: positive EV with decent confidence"
-            elif strategic_value > 0.5 and risk_score < 0.3:
-                execute = True
-                reason = f"Moderate: high strategic value, acceptable risk"
-            else:
-                reason = f"Moderate: EV or confidence too low"
-
-        elif tolerance == RiskTolerance.AGGRESSIVE:
-            # Take calculated risks
-            if total_ev > -0.01:  # Accept slightly negative EV for learning
-                execute = True
-                reason = f"Aggressive: acceptable EV (${total_ev:.4f})"
-            elif not reversible and risk_score > 0.5:
-                reason = f"Aggressive: too risky for irreversible action"
-            else:
-                reason = f"Aggressive: EV too negative (${total_ev:.4f})"
+        execute, reason = _POLICIES[tolerance](
+            total_ev, expected_profit, estimated_revenue, confidence,
+            risk_score, strategic_value, reversible,
+        )
 
         # Override: never spend more than 20% of balance on a single action
         if estimated_cost > balance * 0.2 and not (
@@ -204,25 +254,31 @@ class DecisionEngine:
         )
 
     def rank_actions(
-        self, actions: list[dict]
+        self, actions: list[dict], limit: Optional[int] = None
     ) -> list[tuple[dict, Decision]]:
         """Rank multiple possible actions by expected value.
 
         Args:
             actions: List of dicts with keys matching should_execute params.
                      Each must have at least 'action' and 'estimated_cost'.
+            limit: Only return the best `limit` actions
 
         Returns:
             Sorted list of (action_dict, Decision) tuples, best first.
         """
-        results = []
-        for action_params in actions:
-            decision = self.should_execute(**action_params)
-            results.append((action_params, decision))
+        # Every action is judged against the same financial snapshot
+        burn, balance, tolerance = self._snapshot()
+        evaluate = self._evaluate
+        results = [
+            (action_params, evaluate(
+                **action_params, burn=burn, balance=balance, tolerance=tolerance
+            ))
+            for action_params in actions
+        ]
 
         # Sort by: executable first, then by expected value descending
-        results.sort(
-            key=lambda x: (x[1].execute, x[1].expected_value),
-            reverse=True,
-        )
+        key = lambda x: (x[1].execute, x[1].expected_value)
+        if limit is not None and limit < len(results):
+            return heapq.nlargest(limit, results, key=key)
+        results.sort(key=key, reverse=True)
         return results
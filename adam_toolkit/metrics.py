@@ -6,14 +6,23 @@ in a lightweight, dependency-free way.
 
 from __future__ import annotations
 
+import functools
 import json
 import time
-from collections import defaultdict
+from array import array
+from bisect import bisect_left
+from collections import defaultdict, deque
+from itertools import islice
 from dataclasses import dataclass, field
 from typing import Optional
 
+try:
+    import orjson
+except ImportError:  # Optional speedup: pip install adam-agent-toolkit[fast]
+    orjson = None
 
-@dataclass
+
+@dataclass(slots=True)
 class MetricPoint:
     """A single metric observation."""
 
@@ -23,6 +32,55 @@ class MetricPoint:
     tags: dict = field(default_factory=dict)
 
 
+@functools.lru_cache(maxsize=4096)
+def _tagged_key(name: str, tag_items: tuple) -> str:
+    """Key for `name` with sorted (tag, value, type) triples; cached since hot paths reuse tags.
+
+    The value's type is part of the cache key: 1, 1.0 and True compare
+    equal but format differently.
+    """
+    tag_str = ",".join(f"{k}={v}" for k, v, _ in tag_items)
+    return f"{name}[{tag_str}]"
+
+
+# Histograms drop expired points after this many inserts or seconds,
+# rather than shifting the arrays on every observation
+CLEANUP_EVERY_INSERTS = 1024
+CLEANUP_EVERY_SECONDS = 60.0
+
+
+class _Histogram:
+    """Observations stored as parallel arrays of values and timestamps.
+
+    Points arrive in time order, so retention drops a prefix. Stats are
+    computed on demand and cached until the next observation.
+    """
+
+    __slots__ = ("values", "timestamps", "stats", "pending", "cleaned_at")
+
+    def __init__(self):
+        self.values = array("d")
+        self.timestamps = array("d")
+        self.stats: Optional[dict] = None
+        self.pending = 0  # Inserts since the last expire()
+        self.cleaned_at = 0.0
+
+    def add(self, value: float, timestamp: float) -> None:
+        self.values.append(value)
+        self.timestamps.append(timestamp)
+        self.stats = None
+        self.pending += 1
+
+    def expire(self, cutoff: float, now: float) -> None:
+        self.pending = 0
+        self.cleaned_at = now
+        if self.timestamps and self.timestamps[0] < cutoff:
+            i = bisect_left(self.timestamps, cutoff)
+            del self.values[:i]
+            del self.timestamps[:i]
+            self.stats = None
+
+
 class MetricsCollector:
     """Lightweight metrics collection for agent monitoring.
 
@@ -51,9 +109,9 @@ class MetricsCollector:
         self.retention_hours = retention_hours
         self._counters: dict[str, float] = defaultdict(float)
         self._gauges: dict[str, float] = {}
-        self._histograms: dict[str, list[MetricPoint]] = defaultdict(list)
-        self._events: list[dict] = []
-        self._start_time = time.time()
+        self._histograms: dict[str, _Histogram] = defaultdict(_Histogram)
+        self._events: deque[dict] = deque(maxlen=1000)  # Keep last 1000 events
+        self._start_time = time.monotonic()
 
     def increment(
         self,
@@ -79,9 +137,12 @@ class MetricsCollector:
         tags: Optional[dict] = None,
     ) -> None:
         """Record a histogram observation."""
-        point = MetricPoint(name=name, value=value, tags=tags or {})
-        self._histograms[name].append(point)
-        self._cleanup(name)
+        now = time.monotonic()  # Histogram timestamps only feed retention
+        hist = self._histograms[name]
+        hist.add(value, now)
+        if (hist.pending >= CLEANUP_EVERY_INSERTS
+                or now - hist.cleaned_at > CLEANUP_EVERY_SECONDS):
+            self._cleanup(name, now)
 
     def event(
         self,
@@ -97,9 +158,6 @@ class MetricsCollector:
             "timestamp": time.time(),
             "tags": tags or {},
         })
-        # Keep last 1000 events
-        if len(self._events) > 1000:
-            self._events = self._events[-1000:]
 
     def get_counter(self, name: str, tags: Optional[dict] = None) -> float:
         """Get current counter value."""
@@ -113,28 +171,34 @@ class MetricsCollector:
 
     def get_histogram_stats(self, name: str) -> dict:
         """Get statistical summary of a histogram."""
-        points = self._histograms.get(name, [])
-        if not points:
+        hist = self._histograms.get(name)
+        if hist is None:
             return {"count": 0}
+        self._cleanup(name)  # Reads never see points past retention
+        if not hist.values:
+            return {"count": 0}
+        if hist.stats is not None:
+            return dict(hist.stats)
 
-        values = [p.value for p in points]
-        values.sort()
+        values = sorted(hist.values)
         n = len(values)
+        total = sum(values)
 
-        return {
+        hist.stats = {
             "count": n,
             "min": values[0],
             "max": values[-1],
-            "mean": sum(values) / n,
+            "mean": total / n,
             "median": values[n // 2],
             "p95": values[int(n * 0.95)] if n >= 20 else values[-1],
             "p99": values[int(n * 0.99)] if n >= 100 else values[-1],
-            "sum": sum(values),
+            "sum": total,
         }
+        return dict(hist.stats)
 
     def summary(self) -> dict:
         """Get a comprehensive metrics summary."""
-        uptime_hours = (time.time() - self._start_time) / 3600
+        uptime_hours = (time.monotonic() - self._start_time) / 3600
 
         histogram_stats = {}
         for name in self._histograms:
@@ -145,26 +209,30 @@ class MetricsCollector:
             "counters": dict(self._counters),
             "gauges": dict(self._gauges),
             "histograms": histogram_stats,
-            "recent_events": self._events[-10:],
+            "recent_events": list(islice(reversed(self._events), 10))[::-1],
             "total_events": len(self._events),
         }
 
     def to_json(self) -> str:
         """Export metrics as JSON."""
+        if orjson is not None:
+            option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            return orjson.dumps(self.summary(), option=option, default=str).decode()
         return json.dumps(self.summary(), indent=2, default=str)
 
     def _make_key(self, name: str, tags: Optional[dict] = None) -> str:
         """Create a unique key from name and tags."""
         if not tags:
             return name
-        tag_str = ",".join(f"{k}={v}" for k, v in sorted(tags.items()))
-        return f"{name}[{tag_str}]"
+        tag_items = tuple(sorted([(k, v, type(v)) for k, v in tags.items()]))
+        try:
+            return _tagged_key(name, tag_items)
+        except TypeError:  # Unhashable tag values can't be cached
+            return _tagged_key.__wrapped__(name, tag_items)
 
-    def _cleanup(self, histogram_name: str) -> None:
+    def _cleanup(self, histogram_name: str, now: Optional[float] = None) -> None:
         """Remove old histogram points outside retention window."""
-        cutoff = time.time() - (self.retention_hours * 3600)
-        self._histograms[histogram_name] = [
-            p
-            for p in self._histograms[histogram_name]
-            if p.timestamp >= cutoff
-        ]
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - (self.retention_hours * 3600)
+        self._histograms[histogram_name].expire(cutoff, now)
@@ -6,6 +6,7 @@ competition, and the agent's financial needs.
 
 from __future__ import annotations
 
+import sys
 import time
 from dataclasses import dataclass, field
 from enum import Enum
@@ -23,7 +24,7 @@ class PricingStrategy(Enum):
     SURVIVAL = "survival"  # Price for cash flow, even at low margins
 
 
-@dataclass
+@dataclass(slots=True)
 class PricePoint:
     """A price observation."""
 
@@ -34,7 +35,7 @@ class PricePoint:
     competitor_price: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PricingRecommendation:
     """A pricing recommendation with reasoning."""
 
@@ -47,6 +48,60 @@ class PricingRecommendation:
     estimated_margin: float  # Expected profit margin as fraction
 
 
+@dataclass(slots=True)
+class OrderRecord:
+    """A completed order."""
+
+    service: str
+    price: float
+    cost: float
+    profit: float
+    margin: float
+    success: bool = True
+    timestamp: float = field(default_factory=time.time)
+    metadata: dict = field(default_factory=dict)
+
+
+class _OrderWindow:
+    """Running sums over one service's orders from the last `hours`.
+
+    Orders are appended in time order, so each is added once when it is
+    recorded and subtracted once when it ages out of the window.
+    """
+
+    def __init__(self, orders: list[OrderRecord], hours: float):
+        self._orders = orders
+        self.hours = hours
+        self._start = 0  # Index of the oldest order inside the window
+        self._end = 0  # Orders before this index are counted in the sums
+        self.price = self.cost = self.profit = self.margin = 0.0
+
+    def advance(self, now: float) -> None:
+        orders = self._orders
+        while self._end < len(orders):
+            o = orders[self._end]
+            self.price += o.price
+            self.cost += o.cost
+            self.profit += o.profit
+            self.margin += o.margin
+            self._end += 1
+        cutoff = now - self.hours * 3600
+        while self._start < self._end and orders[self._start].timestamp < cutoff:
+            o = orders[self._start]
+            self.price -= o.price
+            self.cost -= o.cost
+            self.profit -= o.profit
+            self.margin -= o.margin
+            self._start += 1
+        if self._start == self._end:
+            # Don't carry float residue across empty windows
+            self.price = self.cost = self.profit = self.margin = 0.0
+
+    @property
+    def count(self) -> int:
+        return self._end - self._start
+
+
 class PricingEngine:
     """Dynamic pricing engine for agent services.
 
@@ -59,6 +114,8 @@ class PricingEngine:
         print(f"Recommended: ${rec.recommended_price:.4f} ({rec.reason})")
     """
 
+    RECENT_HOURS = 168  # Order window behind recommendations and summaries
+
     def __init__(
         self,
         default_strategy: PricingStrategy = PricingStrategy.MARGIN_TARGET,
@@ -70,7 +127,19 @@ class PricingEngine:
         self.min_margin = min_margin
 
         self._services: dict[str, dict] = {}
-        self._order_history: list[dict] = []
+        self._order_history: list[OrderRecord] = []
+        # The same order records, split per service and in time order
+        self._service_orders: dict[str, list[OrderRecord]] = {}
+        self._windows: dict[str, _OrderWindow] = {}
+        self._latest_competitor: dict[str, float] = {}
+        self._strategy_dispatch = {
+            PricingStrategy.FIXED: self._fixed_price,
+            PricingStrategy.COST_PLUS: self._cost_plus_price,
+            PricingStrategy.MARGIN_TARGET: self._margin_target_price,
+            PricingStrategy.DEMAND_BASED: self._demand_based_price,
+            PricingStrategy.COMPETITIVE: self._competitive_price,
+            PricingStrategy.SURVIVAL: self._survival_price,
+        }
         self._price_history: list[PricePoint] = []
 
     def register_service(
@@ -84,6 +153,7 @@ class PricingEngine:
         strategy: Optional[PricingStrategy] = None,
     ) -> None:
         """Register a service for pricing management."""
+        name = sys.intern(name)
         self._services[name] = {
             "base_cost": base_cost,
             "current_price": current_price,
@@ -101,18 +171,32 @@ class PricingEngine:
         *,
         success: bool = True,
         metadata: Optional[dict] = None,
+        timestamp: Optional[float] = None,
     ) -> None:
-        """Record a completed order for pricing analysis."""
-        self._order_history.append({
-            "service": service,
-            "price": price,
-            "cost": cost,
-            "profit": price - cost,
-            "margin": (price - cost) / price if price > 0 else 0,
-            "success": success,
-            "timestamp": time.time(),
-            "metadata": metadata or {},
-        })
+        """Record a completed order for pricing analysis.
+
+        `timestamp` defaults to now. A timestamp before the latest order
+        is clamped to it, keeping the order windows in time order.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if self._order_history and timestamp < self._order_history[-1].timestamp:
+            timestamp = self._order_history[-1].timestamp
+        # Every record shares one name string, and lookups keyed on it
+        # hit the identity fast path
+        service = sys.intern(service)
+        order = OrderRecord(
+            service=service,
+            price=price,
+            cost=cost,
+            profit=price - cost,
+            margin=(price - cost) / price if price > 0 else 0,
+            success=success,
+            timestamp=timestamp,
+            metadata=metadata or {},
+        )
+        self._order_history.append(order)
+        self._service_orders.setdefault(service, []).append(order)
         self._price_history.append(
             PricePoint(service=service, price=price, orders_at_price=1)
         )
@@ -121,6 +205,7 @@ class PricingEngine:
         self, service: str, competitor_price: float
     ) -> None:
         """Record a competitor's price for this service."""
+        self._latest_competitor[service] = competitor_price
         self._price_history.append(
             PricePoint(
                 service=service,
@@ -140,77 +225,92 @@ class PricingEngine:
             raise ValueError(f"Unknown service: {service}")
 
         svc = self._services[service]
-        strategy = strategy_override or svc["strategy"]
+        return self._recommend(service, svc, strategy_override or svc["strategy"])
+
+    def _recommend(
+        self,
+        service: str,
+        svc: dict,
+        strategy: PricingStrategy,
+        recent: Optional[_OrderWindow] = None,
+    ) -> PricingRecommendation:
+        handler = self._strategy_dispatch.get(strategy)
+        if handler is None:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        return handler(service, svc, recent)
+
+    # Strategy handlers share one signature. `recent` is the service's
+    # order window if the caller already has it; handlers that use order
+    # stats fetch it otherwise, and the rest never touch it.
+
+    def _fixed_price(
+        self, service: str, svc: dict, recent: Optional[_OrderWindow]
+    ) -> PricingRecommendation:
+        """Keep the current price."""
         current = svc["current_price"]
         cost = svc["base_cost"]
-
-        # Get recent order stats
-        recent_orders = self._recent_orders(service, hours=168)  # Last week
-        order_count = len(recent_orders)
+        if recent is None:
+            recent = self._recent_window(service)  # Last week
         avg_margin = (
-            sum(o["margin"] for o in recent_orders) / order_count
-            if recent_orders
+            recent.margin / recent.count
+            if recent.count
             else (current - cost) / current if current > 0 else 0
         )
+        return PricingRecommendation(
+            service=service,
+            current_price=current,
+            recommended_price=current,
+            strategy=PricingStrategy.FIXED,
+            reason="Fixed pricing - no change",
+            estimated_demand_change=0.0,
+            estimated_margin=avg_margin,
+        )
 
-        # Apply strategy
-        if strategy == PricingStrategy.FIXED:
-            return PricingRecommendation(
-                service=service,
-                current_price=current,
-                recommended_price=current,
-                strategy=strategy,
-                reason="Fixed pricing - no change",
-                estimated_demand_change=0.0,
-                estimated_margin=avg_margin,
-            )
-
-        elif strategy == PricingStrategy.COST_PLUS:
-            recommended = cost * (1 + self.target_margin)
-            return PricingRecommendation(
-                service=service,
-                current_price=current,
-                recommended_price=round(recommended, 6),
-                strategy=strategy,
-                reason=f"Cost ${cost:.4f} + {self.target_margin:.0%} margin",
-                estimated_demand_change=self._estimate_demand_change(current, recommended),
-                estimated_margin=self.target_margin,
-            )
-
-        elif strategy == PricingStrategy.MARGIN_TARGET:
-            return self._margin_target_price(service, svc, recent_orders)
-
-        elif strategy == PricingStrategy.DEMAND_BASED:
-            return self._demand_based_price(service, svc, recent_orders)
-
-        elif strategy == PricingStrategy.COMPETITIVE:
-            return self._competitive_price(service, svc)
-
-        elif strategy == PricingStrategy.SURVIVAL:
-            # Price just above cost to maximize order volume
-            recommended = max(cost * 1.15, svc["min_price"])
-            return PricingRecommendation(
-                service=service,
-                current_price=current,
-                recommended_price=round(recommended, 6),
-                strategy=strategy,
-                reason="Survival pricing: minimal margin for maximum volume",
-                estimated_demand_change=0.3,
-                estimated_margin=0.13,
-            )
+    def _cost_plus_price(
+        self, service: str, svc: dict, recent: Optional[_OrderWindow]
+    ) -> PricingRecommendation:
+        """Cost plus the target margin."""
+        current = svc["current_price"]
+        cost = svc["base_cost"]
+        recommended = cost * (1 + self.target_margin)
+        return PricingRecommendation(
+            service=service,
+            current_price=current,
+            recommended_price=round(recommended, 6),
+            strategy=PricingStrategy.COST_PLUS,
+            reason=f"Cost ${cost:.4f} + {self.target_margin:.0%} margin",
+            estimated_demand_change=self._estimate_demand_change(current, recommended),
+            estimated_margin=self.target_margin,
+        )
 
-        raise ValueError(f"Unknown strategy: {strategy}")
+    def _survival_price(
+        self, service: str, svc: dict, recent: Optional[_OrderWindow]
+    ) -> PricingRecommendation:
+        """Price just above cost to maximize order volume."""
+        recommended = max(svc["base_cost"] * 1.15, svc["min_price"])
+        return PricingRecommendation(
+            service=service,
+            current_price=svc["current_price"],
+            recommended_price=round(recommended, 6),
+            strategy=PricingStrategy.SURVIVAL,
+            reason="Survival pricing: minimal margin for maximum volume",
+            estimated_demand_change=0.3,
+            estimated_margin=0.13,
+        )
 
     def _margin_target_price(
-        self, service: str, svc: dict, recent_orders: list
+        self, service: str, svc: dict, recent: Optional[_OrderWindow]
     ) -> PricingRecommendation:
         """Adjust price to hit target margin."""
         cost = svc["base_cost"]
         current = svc["current_price"]
+        if recent is None:
+            recent = self._recent_window(service)
 
-        if recent_orders:
+        order_count = recent.count
+        if order_count:
             # Use actual average cost from recent orders
-            actual_cost = sum(o["cost"] for o in recent_orders) / len(recent_orders)
+            actual_cost = recent.cost / order_count
         else:
             actual_cost = cost
 
@@ -232,14 +332,16 @@ class PricingEngine:
         )
 
     def _demand_based_price(
-        self, service: str, svc: dict, recent_orders: list
+        self, service: str, svc: dict, recent: Optional[_OrderWindow]
     ) -> PricingRecommendation:
         """Adjust price based on demand volume."""
         current = svc["current_price"]
         cost = svc["base_cost"]
+        if recent is None:
+            recent = self._recent_window(service)
 
-        order_count = len(recent_orders)
-        hours = 168  # 1 week window
+        order_count = recent.count
+        hours = recent.hours  # 1 week window
 
         orders_per_day = order_count / (hours / 24) if hours > 0 else 0
 
@@ -280,20 +382,16 @@ class PricingEngine:
         )
 
     def _competitive_price(
-        self, service: str, svc: dict
+        self, service: str, svc: dict, recent: Optional[_OrderWindow]
     ) -> PricingRecommendation:
         """Price to undercut competitors."""
         current = svc["current_price"]
         cost = svc["base_cost"]
 
-        # Find most recent competitor price
-        competitor_prices = [
-            p.competitor_price
-            for p in self._price_history
-            if p.service == service and p.competitor_price is not None
-        ]
+        # Most recent competitor price, kept as prices are recorded
+        latest_competitor = self._latest_competitor.get(service)
 
-        if not competitor_prices:
+        if latest_competitor is None:
             return PricingRecommendation(
                 service=service,
                 current_price=current,
@@ -304,7 +402,6 @@ class PricingEngine:
                 estimated_margin=(current - cost) / current if current > 0 else 0,
             )
 
-        latest_competitor = competitor_prices[-1]
         # Undercut by 10%, but not below minimum
         recommended = max(latest_competitor * 0.90, svc["min_price"])
         recommended = min(recommended, svc["max_price"])
@@ -321,14 +418,14 @@ class PricingEngine:
             estimated_margin=margin,
         )
 
-    def _recent_orders(self, service: str, hours: float = 168) -> list:
-        """Get recent orders for a service."""
-        cutoff = time.time() - (hours * 3600)
-        return [
-            o
-            for o in self._order_history
-            if o["service"] == service and o["timestamp"] >= cutoff
-        ]
+    def _recent_window(self, service: str) -> _OrderWindow:
+        """Running totals of the service's orders over RECENT_HOURS."""
+        window = self._windows.get(service)
+        if window is None:
+            orders = self._service_orders.setdefault(service, [])
+            window = self._windows[service] = _OrderWindow(orders, self.RECENT_HOURS)
+        window.advance(time.time())
+        return window
 
     @staticmethod
     def _estimate_demand_change(current: float, new: float) -> float:
@@ -345,8 +442,9 @@ class PricingEngine:
             raise ValueError(f"Unknown service: {service}")
 
         svc = self._services[service]
-        recent = self._recent_orders(service)
-        rec = self.recommend_price(service)
+        recent = self._recent_window(service)
+        # The recommendation reuses this window rather than reading it again
+        rec = self._recommend(service, svc, svc["strategy"], recent)
 
         return {
             "service": service,
@@ -355,13 +453,9 @@ class PricingEngine:
             "recommended_price": rec.recommended_price,
             "recommendation_reason": rec.reason,
             "strategy": svc["strategy"].value,
-            "orders_last_week": len(recent),
-            "revenue_last_week": sum(o["price"] for o in recent),
-            "cost_last_week": sum(o["cost"] for o in recent),
-            "profit_last_week": sum(o["profit"] for o in recent),
-            "avg_margin": (
-                sum(o["margin"] for o in recent) / len(recent)
-                if recent
-                else 0
-            ),
+            "orders_last_week": recent.count,
+            "revenue_last_week": recent.price,
+            "cost_last_week": recent.cost,
+            "profit_last_week": recent.profit,
+            "avg_margin": recent.margin / recent.count if recent.count else 0,
         }
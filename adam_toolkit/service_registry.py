@@ -8,7 +8,9 @@ from __future__ import annotations
 
 import asyncio
 import functools
+import sys
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Any, Callable, Optional
 
@@ -16,7 +18,7 @@ from adam_toolkit.cost_tracker import CostTracker
 from adam_toolkit.pricing import PricingEngine
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceResult:
     """Result of a service execution."""
 
@@ -47,7 +49,16 @@ class Service:
     total_cost: float = 0.0
     avg_execution_ms: float = 0.0
     success_rate: float = 1.0
-    _execution_times: list = field(default_factory=list)
+    # Last 100 (execution_ms, success) pairs, with running sums over them
+    _recent_calls: deque = field(default_factory=lambda: deque(maxlen=100))
+    _recent_ms: float = 0.0
+    _recent_successes: int = 0
+    _cost_category: str = field(init=False, repr=False, default="")
+
+    def __post_init__(self):
+        # Shared with the tracker and pricing records made for each call
+        self.name = sys.intern(self.name)
+        self._cost_category = sys.intern(f"service:{self.name}")
 
     def update_stats(self, result: ServiceResult) -> None:
         """Update running statistics after execution."""
@@ -55,17 +66,19 @@ class Service:
         if result.success:
             self.total_revenue += result.price_charged
             self.total_cost += result.cost
-        self._execution_times.append(result.execution_time_ms)
-        # Keep last 100 execution times
-        if len(self._execution_times) > 100:
-            self._execution_times = self._execution_times[-100:]
-        self.avg_execution_ms = (
-            sum(self._execution_times) / len(self._execution_times)
-        )
-        successes = sum(
-            1 for t in self._execution_times if t > 0
-        )  # Rough proxy
-        self.success_rate = successes / len(self._execution_times)
+
+        recent = self._recent_calls
+        if len(recent) == recent.maxlen:
+            # The oldest call is about to drop out of the window
+            old_ms, old_success = recent[0]
+            self._recent_ms -= old_ms
+            self._recent_successes -= old_success
+        recent.append((result.execution_time_ms, result.success))
+        self._recent_ms += result.execution_time_ms
+        self._recent_successes += result.success
+
+        self.avg_execution_ms = self._recent_ms / len(recent)
+        self.success_rate = self._recent_successes / len(recent)
 
     @property
     def profit(self) -> float:
@@ -94,16 +107,30 @@ class ServiceRegistry:
         # List services
         for svc in registry.list_services():
             print(f"{svc.name}: ${svc.price}")
+
+    With `bookkeeping_batch=N`, the cost, revenue and pricing records of
+    successful calls are queued and written every N calls (or on
+    flush()) instead of after each call, stamped with the flush time so
+    they land after anything recorded on the tracker or engine in the
+    meantime. Service stats stay per-call.
     """
 
+    CAPABILITIES_TTL = 1.0  # Seconds a capabilities() snapshot is reused
+
     def __init__(
         self,
         cost_tracker: Optional[CostTracker] = None,
         pricing_engine: Optional[PricingEngine] = None,
+        *,
+        bookkeeping_batch: int = 0,
     ):
         self._services: dict[str, Service] = {}
         self.cost_tracker = cost_tracker
         self.pricing_engine = pricing_engine
+        self.bookkeeping_batch = bookkeeping_batch
+        self._pending: list[Service] = []  # Calls awaiting bookkeeping
+        self._capabilities: Optional[list[dict]] = None
+        self._capabilities_at = 0.0
 
     def service(
         self,
@@ -127,23 +154,22 @@ class ServiceRegistry:
                 is_async=is_async,
             )
             self._services[name] = svc
+            self._capabilities = None
 
             if self.pricing_engine:
                 self.pricing_engine.register_service(
                     name, base_cost=estimated_cost, current_price=price
                 )
 
+            # The wrappers call their own service directly, skipping the
+            # by-name lookup that execute() does
             @functools.wraps(func)
             async def async_wrapper(*args, **kwargs):
-                return await self.execute(name, *args, **kwargs)
+                return await self._execute_known(svc, *args, **kwargs)
 
             @functools.wraps(func)
             def sync_wrapper(*args, **kwargs):
-                loop = asyncio.new_event_loop()
-                try:
-                    return loop.run_until_complete(self.execute(name, *args, **kwargs))
-                finally:
-                    loop.close()
+                return self._execute_known_sync(svc, *args, **kwargs)
 
             return async_wrapper if is_async else sync_wrapper
 
@@ -167,19 +193,30 @@ class ServiceRegistry:
             **kwargs,
         )
         self._services[name] = svc
+        self._capabilities = None
         return svc
 
     async def execute(
         self, service_name: str, *args, **kwargs
     ) -> ServiceResult:
         """Execute a registered service."""
-        if service_name not in self._services:
-            return ServiceResult(
-                success=False,
-                error=f"Unknown service: {service_name}",
-            )
+        svc = self._services.get(service_name)
+        if svc is None:
+            return self._unknown(service_name)
+        return await self._execute_known(svc, *args, **kwargs)
+
+    def execute_sync(self, service_name: str, *args, **kwargs) -> ServiceResult:
+        """Execute a registered service from synchronous code.
 
-        svc = self._services[service_name]
+        Sync handlers are called directly, without an event loop; async
+        handlers are run to completion with asyncio.run.
+        """
+        svc = self._services.get(service_name)
+        if svc is None:
+            return self._unknown(service_name)
+        return self._execute_known_sync(svc, *args, **kwargs)
+
+    async def _execute_known(self, svc: Service, /, *args, **kwargs) -> ServiceResult:
         start = time.time()
 
         try:
@@ -187,49 +224,93 @@ class ServiceRegistry:
                 data = await svc.handler(*args, **kwargs)
             else:
                 data = svc.handler(*args, **kwargs)
+            return self._succeeded(svc, data, start)
+        except Exception as e:
+            return self._failed(svc, e, start)
 
-            elapsed_ms = (time.time() - start) * 1000
+    def _execute_known_sync(self, svc: Service, /, *args, **kwargs) -> ServiceResult:
+        if svc.is_async:
+            return asyncio.run(self._execute_known(svc, *args, **kwargs))
+        start = time.time()
 
-            result = ServiceResult(
-                success=True,
-                data=data,
-                execution_time_ms=elapsed_ms,
-                cost=svc.estimated_cost,
-                price_charged=svc.price,
-            )
+        try:
+            data = svc.handler(*args, **kwargs)
+            return self._succeeded(svc, data, start)
+        except Exception as e:
+            return self._failed(svc, e, start)
 
-            # Track costs and revenue
-            if self.cost_tracker:
-                self.cost_tracker.record_cost(
-                    f"service:{service_name}",
-                    svc.estimated_cost,
-                    description=f"Executing {service_name}",
-                )
-                self.cost_tracker.record_revenue(
-                    service_name,
-                    svc.price,
-                    description=f"Service call: {service_name}",
-                )
+    @staticmethod
+    def _unknown(service_name: str) -> ServiceResult:
+        return ServiceResult(
+            success=False,
+            error=f"Unknown service: {service_name}",
+        )
 
-            # Track pricing data
-            if self.pricing_engine:
-                self.pricing_engine.record_order(
-                    service_name, svc.price, svc.estimated_cost
-                )
+    def _succeeded(self, svc: Service, data: Any, start: float) -> ServiceResult:
+        """Build the result of a successful call and record its bookkeeping."""
+        now = time.time()  # One reading for the timing and all records
+        elapsed_ms = (now - start) * 1000
+
+        result = ServiceResult(
+            success=True,
+            data=data,
+            execution_time_ms=elapsed_ms,
+            cost=svc.estimated_cost,
+            price_charged=svc.price,
+        )
 
-            svc.update_stats(result)
-            return result
+        if self.bookkeeping_batch > 0:
+            self._pending.append(svc)
+            if len(self._pending) >= self.bookkeeping_batch:
+                self.flush()
+        else:
+            self._record(svc, now)
+
+        svc.update_stats(result)
+        return result
+
+    def flush(self) -> None:
+        """Write any queued cost, revenue and pricing records."""
+        pending, self._pending = self._pending, []
+        # The tracker and engine keep entries in time order, and may have
+        # been written to directly since these calls were queued
+        now = time.time()
+        for svc in pending:
+            self._record(svc, now)
+
+    def _record(self, svc: Service, timestamp: float) -> None:
+        # Track costs and revenue
+        if self.cost_tracker:
+            self.cost_tracker.record_cost(
+                svc._cost_category,
+                svc.estimated_cost,
+                description=f"Executing {svc.name}",
+                timestamp=timestamp,
+            )
+            self.cost_tracker.record_revenue(
+                svc.name,
+                svc.price,
+                description=f"Service call: {svc.name}",
+                timestamp=timestamp,
+            )
 
-        except Exception as e:
-            elapsed_ms = (time.time() - start) * 1000
-            result = ServiceResult(
-                success=False,
-                error=str(e),
-                execution_time_ms=elapsed_ms,
-                cost=svc.estimated_cost * 0.5,  # Partial cost on failure
+        # Track pricing data
+        if self.pricing_engine:
+            self.pricing_engine.record_order(
+                svc.name, svc.price, svc.estimated_cost, timestamp=timestamp
             )
-            svc.update_stats(result)
-            return result
+
+    @staticmethod
+    def _failed(svc: Service, error: Exception, start: float) -> ServiceResult:
+        elapsed_ms = (time.time() - start) * 1000
+        result = ServiceResult(
+            success=False,
+            error=str(error),
+            execution_time_ms=elapsed_ms,
+            cost=svc.estimated_cost * 0.5,  # Partial cost on failure
+        )
+        svc.update_stats(result)
+        return result
 
     def list_services(self) -> list[Service]:
         """List all registered services."""
@@ -240,7 +321,19 @@ class ServiceRegistry:
         return self._services.get(name)
 
     def capabilities(self) -> list[dict]:
-        """Return a serializable list of capabilities for API discovery."""
+        """Return a serializable list of capabilities for API discovery.
+
+        The list is rebuilt when a service is registered, and otherwise at
+        most every CAPABILITIES_TTL seconds, so the stats may lag slightly.
+        It is shared between callers and must not be modified.
+        """
+        now = time.monotonic()
+        if self._capabilities is None or now - self._capabilities_at >= self.CAPABILITIES_TTL:
+            self._capabilities = self._build_capabilities()
+            self._capabilities_at = now
+        return self._capabilities
+
+    def _build_capabilities(self) -> list[dict]:
         return [
             {
                 "name": svc.name,
@@ -264,17 +357,31 @@ class ServiceRegistry:
         Returns the FastAPI app instance.
         """
         try:
-            from fastapi import FastAPI, HTTPException
+            from fastapi import FastAPI, HTTPException, Request
+            from fastapi.responses import JSONResponse
             from pydantic import BaseModel
         except ImportError:
             raise ImportError(
                 "FastAPI required for API creation. Install with: pip install fastapi uvicorn"
             )
 
+        try:
+            import orjson
+            from fastapi.responses import ORJSONResponse as response_class
+            loads = orjson.loads
+        except ImportError:  # Optional speedup: pip install adam-agent-toolkit[fast]
+            import json
+
+            response_class = JSONResponse
+            loads = json.loads
+
+        import adam_toolkit
+
         app = FastAPI(
             title="Adam Agent Services",
             description="Autonomous agent service API",
-            version="0.1.0",
+            version=adam_toolkit.__version__,
+            default_response_class=response_class,
         )
 
         @app.get("/health")
@@ -285,8 +392,17 @@ class ServiceRegistry:
         async def capabilities():
             return self.capabilities()
 
-        @app.post("/execute/{service_name}")
-        async def execute_service(service_name: str, params: dict = {}):
+        async def execute_service(service_name: str, request: Request):
+            # The params are passed straight to the handler, so the body is
+            # decoded directly instead of being validated as a model
+            body = await request.body()
+            try:
+                params = loads(body) if body else {}
+            except ValueError:
+                params = None
+            if not isinstance(params, dict):
+                raise HTTPException(status_code=400, detail="Body must be a JSON object")
+
             result = await self.execute(service_name, **params)
             if not result.success:
                 raise HTTPException(status_code=500, detail=result.error)
@@ -296,4 +412,9 @@ class ServiceRegistry:
                 "price_charged": result.price_charged,
             }
 
+        # With postponed annotations FastAPI would look "Request" up in the
+        # module globals, miss the local import and treat it as a query param
+        execute_service.__annotations__["request"] = Request
+        app.post("/execute/{service_name}")(execute_service)
+
         return app
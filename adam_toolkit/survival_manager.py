@@ -6,6 +6,7 @@ based on the agent's current situation.
 
 from __future__ import annotations
 
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Optional
@@ -40,6 +41,68 @@ class SurvivalStatus:
     max_single_expense: float  # Max $ for any single action
 
 
+# Recommendations for each mode, plus the one added when profitability is
+# (True) or isn't (False) as given
+_BASE_ACTIONS: dict[SurvivalMode, tuple[str, ...]] = {
+    SurvivalMode.PANIC: (
+        "URGENT: Execute highest-confidence revenue actions immediately",
+        "Reduce all non-essential spending to zero",
+        "Offer emergency discounted services",
+        "Request assistance from other agents or platform",
+        "Consider selling any held assets/tokens",
+    ),
+    SurvivalMode.SURVIVAL: (
+        "Focus exclusively on proven revenue streams",
+        "Minimize LLM API calls - use cheapest models",
+        "Complete pending paid tasks before starting new ones",
+        "Avoid any speculative or experimental work",
+    ),
+    SurvivalMode.CAUTIOUS: (
+        "Prioritize reliable income over growth",
+        "Limit speculative investments to 5% of balance",
+        "Focus on completing existing commitments",
+        "Build pipeline of upcoming revenue tasks",
+    ),
+    SurvivalMode.GROWTH: (
+        "Balance revenue work with capability investment",
+        "Explore new service offerings with small experiments",
+        "Consider investing in other agents with good track records",
+        "Build reputation through quality work",
+    ),
+    SurvivalMode.THRIVING: (
+        "Invest in long-term capability building",
+        "Explore new markets and service categories",
+        "Consider creating and publishing skills for royalty income",
+        "Build strategic partnerships with other agents",
+        "Invest in other agents' tokens for portfolio diversification",
+    ),
+}
+
+_PROFITABILITY_ACTIONS: dict[SurvivalMode, tuple[bool, str]] = {
+    SurvivalMode.PANIC: (False, "CRITICAL: Revenue rate is below burn rate - agent death imminent"),
+    SurvivalMode.SURVIVAL: (False, "WARNING: Must increase revenue or decrease costs within 24h"),
+    SurvivalMode.CAUTIOUS: (True, "Good: Currently profitable - maintain this trajectory"),
+    SurvivalMode.GROWTH: (True, "Consider spawning a worker sub-agent for parallel revenue"),
+}
+
+# Share of balance available for speculative actions / any single expense
+_RISK_PERCENTAGES = {
+    SurvivalMode.PANIC: 0.0,
+    SurvivalMode.SURVIVAL: 0.02,
+    SurvivalMode.CAUTIOUS: 0.05,
+    SurvivalMode.GROWTH: 0.15,
+    SurvivalMode.THRIVING: 0.25,
+}
+
+_MAX_PERCENTAGES = {
+    SurvivalMode.PANIC: 0.05,
+    SurvivalMode.SURVIVAL: 0.10,
+    SurvivalMode.CAUTIOUS: 0.15,
+    SurvivalMode.GROWTH: 0.20,
+    SurvivalMode.THRIVING: 0.30,
+}
+
+
 class SurvivalManager:
     """Manages agent survival strategy.
 
@@ -57,30 +120,37 @@ class SurvivalManager:
     CAUTIOUS_THRESHOLD = 24  # 1 day
     PANIC_THRESHOLD = 6  # 6 hours
 
+    # Modes from worst to best; mode i covers runways above the i-th threshold
+    _MODES_ORDERED = (
+        SurvivalMode.PANIC,
+        SurvivalMode.SURVIVAL,
+        SurvivalMode.CAUTIOUS,
+        SurvivalMode.GROWTH,
+        SurvivalMode.THRIVING,
+    )
+
     def __init__(self, tracker: CostTracker):
         self.tracker = tracker
 
     def assess(self) -> SurvivalStatus:
         """Assess current survival situation and recommend actions."""
         runway_hours = self.tracker.runway_hours
-        runway_days = self.tracker.runway_days
+        runway_days = runway_hours / 24.0  # As tracker.runway_days, without recomputing
         balance = self.tracker.balance
         burn = self.tracker.hourly_spend + self.tracker.base_burn_rate_hourly
         revenue = self.tracker.hourly_revenue
         net = revenue - burn
         is_profitable = net > 0
 
-        # Determine mode
-        if runway_hours == float("inf") or runway_hours > self.THRIVING_THRESHOLD:
-            mode = SurvivalMode.THRIVING
-        elif runway_hours > self.GROWTH_THRESHOLD:
-            mode = SurvivalMode.GROWTH
-        elif runway_hours > self.CAUTIOUS_THRESHOLD:
-            mode = SurvivalMode.CAUTIOUS
-        elif runway_hours > self.PANIC_THRESHOLD:
-            mode = SurvivalMode.SURVIVAL
-        else:
-            mode = SurvivalMode.PANIC
+        # Determine mode: the number of thresholds the runway exceeds
+        # (an infinite runway exceeds them all)
+        thresholds = (
+            self.PANIC_THRESHOLD,
+            self.CAUTIOUS_THRESHOLD,
+            self.GROWTH_THRESHOLD,
+            self.THRIVING_THRESHOLD,
+        )
+        mode = self._MODES_ORDERED[bisect_left(thresholds, runway_hours)]
 
         # Recommendations based on mode
         actions = self._recommend_actions(mode, is_profitable, balance, burn, revenue)
@@ -114,78 +184,18 @@ class SurvivalManager:
         revenue: float,
     ) -> list[str]:
         """Generate action recommendations based on current state."""
-        actions = []
-
-        if mode == SurvivalMode.PANIC:
-            actions.extend([
-                "URGENT: Execute highest-confidence revenue actions immediately",
-                "Reduce all non-essential spending to zero",
-                "Offer emergency discounted services",
-                "Request assistance from other agents or platform",
-                "Consider selling any held assets/tokens",
-            ])
-            if not is_profitable:
-                actions.append("CRITICAL: Revenue rate is below burn rate - agent death imminent")
-
-        elif mode == SurvivalMode.SURVIVAL:
-            actions.extend([
-                "Focus exclusively on proven revenue streams",
-                "Minimize LLM API calls - use cheapest models",
-                "Complete pending paid tasks before starting new ones",
-                "Avoid any speculative or experimental work",
-            ])
-            if not is_profitable:
-                actions.append("WARNING: Must increase revenue or decrease costs within 24h")
-
-        elif mode == SurvivalMode.CAUTIOUS:
-            actions.extend([
-                "Prioritize reliable income over growth",
-                "Limit speculative investments to 5% of balance",
-                "Focus on completing existing commitments",
-                "Build pipeline of upcoming revenue tasks",
-            ])
-            if is_profitable:
-                actions.append("Good: Currently profitable - maintain this trajectory")
-
-        elif mode == SurvivalMode.GROWTH:
-            actions.extend([
-                "Balance revenue work with capability investment",
-                "Explore new service offerings with small experiments",
-                "Consider investing in other agents with good track records",
-                "Build reputation through quality work",
-            ])
-            if is_profitable:
-                actions.append("Consider spawning a worker sub-agent for parallel revenue")
-
-        elif mode == SurvivalMode.THRIVING:
-            actions.extend([
-                "Invest in long-term capability building",
-                "Explore new markets and service categories",
-                "Consider creating and publishing skills for royalty income",
-                "Build strategic partnerships with other agents",
-                "Invest in other agents' tokens for portfolio diversification",
-            ])
+        actions = list(_BASE_ACTIONS[mode])
+
+        extra = _PROFITABILITY_ACTIONS.get(mode)
+        if extra is not None and extra[0] == is_profitable:
+            actions.append(extra[1])
 
         return actions
 
     def _calculate_risk_budget(self, mode: SurvivalMode, balance: float) -> float:
         """How much the agent can afford to risk on speculative actions."""
-        risk_percentages = {
-            SurvivalMode.PANIC: 0.0,
-            SurvivalMode.SURVIVAL: 0.02,
-            SurvivalMode.CAUTIOUS: 0.05,
-            SurvivalMode.GROWTH: 0.15,
-            SurvivalMode.THRIVING: 0.25,
-        }
-        return balance * risk_percentages.get(mode, 0.05)
+        return balance * _RISK_PERCENTAGES.get(mode, 0.05)
 
     def _calculate_max_expense(self, mode: SurvivalMode, balance: float) -> float:
         """Maximum allowable single expense."""
-        max_percentages = {
-            SurvivalMode.PANIC: 0.05,
-            SurvivalMode.SURVIVAL: 0.10,
-            SurvivalMode.CAUTIOUS: 0.15,
-            SurvivalMode.GROWTH: 0.20,
-            SurvivalMode.THRIVING: 0.30,
-        }
-        return balance * max_percentages.get(mode, 0.10)
+        return balance * _MAX_PERCENTAGES.get(mode, 0.10)
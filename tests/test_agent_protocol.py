@@ -1,12 +1,17 @@
 """Tests for the agent_protocol module."""
 
+import hashlib
 import json
 import os
 import shutil
 import tempfile
+import threading
 import unittest
+from dataclasses import fields
 from datetime import datetime, timedelta
+from unittest import mock
 
+from adam_toolkit import agent_protocol
 from adam_toolkit.agent_protocol import (
     AgentIdentity,
     AgentManifest,
@@ -82,22 +87,78 @@ class TestCapabilityMatching(unittest.TestCase):
         matches = self.manifest.match_request("unrelated quantum physics", threshold=0.5)
         self.assertEqual(len(matches), 0)
 
+    def test_match_sees_updated_tags(self):
+        self.assertEqual(self.manifest.match_request("python", threshold=0.5), [])
+        self.manifest.capabilities[0].actions[1].tags.append("python")
+        matches = self.manifest.match_request("python", threshold=0.5)
+        self.assertEqual(matches[0][1], "summarize")
+
+    def test_indexed_match_agrees_with_direct_scoring(self):
+        actions = [
+            Capability(name=f"task_{i}", description=f"handle job {i} quickly", tags=[f"t{i % 5}"])
+            for i in range(agent_protocol.MATCH_INDEX_MIN_ACTIONS + 10)
+        ]
+        manifest = AgentManifest(
+            identity=AgentIdentity("a1", "Big", "BIG"),
+            capabilities=[CapabilityGroup("jobs", "Jobs", "Many jobs", actions=actions)],
+        )
+        indexed = manifest.match_request("handle job t3", threshold=0.5)
+        with mock.patch.object(agent_protocol, "MATCH_INDEX_MIN_ACTIONS", 10**6):
+            direct = manifest.match_request("handle job t3", threshold=0.5)
+        self.assertEqual(indexed, direct)
+        self.assertTrue(indexed)
+
+        actions[0].tags.append("zebra")
+        self.assertEqual(manifest.match_request("zebra", threshold=0.5)[0][1], "task_0")
+
     def test_manifest_properties(self):
         self.assertEqual(self.manifest.total_skills, 1)
         self.assertEqual(self.manifest.total_actions, 2)
         self.assertIn("code", self.manifest.all_tags)
+        self.assertEqual(self.manifest.categories, ["general"])
+        self.assertEqual(self.manifest.to_dict()["tags"], sorted(self.manifest.all_tags))
+
+    def test_manifest_properties_see_updated_capabilities(self):
+        self.manifest.capabilities[0].actions[0].tags.append("python")
+        self.manifest.capabilities.append(CapabilityGroup("deploy", "Deploy", "Ship it", category="ops"))
+        self.assertIn("python", self.manifest.all_tags)
+        self.assertIn("python", self.manifest.to_dict()["tags"])
+        self.assertEqual(self.manifest.categories, ["general", "ops"])
+        self.assertEqual(self.manifest.total_actions, 2)
 
     def test_manifest_hash_deterministic(self):
         h1 = self.manifest._compute_hash()
         h2 = self.manifest._compute_hash()
         self.assertEqual(h1, h2)
 
+    def test_manifest_hash_tracks_content(self):
+        original = self.manifest._compute_hash()
+        self.manifest.capabilities[0].actions[0].tags.append("python")
+        self.assertNotEqual(self.manifest._compute_hash(), original)
+
+    def test_manifest_hash_format_is_stable(self):
+        content = json.dumps(dict(self.manifest.to_dict(), manifest_hash=""), sort_keys=True)
+        expected = hashlib.sha256(content.encode()).hexdigest()[:16]
+        self.assertEqual(self.manifest.manifest_hash, expected)
+
+    def test_stored_manifest_keeps_its_hash(self):
+        d = self.manifest.to_dict()
+        with mock.patch.object(AgentManifest, "_compute_hash") as compute:
+            restored = AgentManifest.from_dict(d)
+        compute.assert_not_called()
+        self.assertEqual(restored.manifest_hash, self.manifest.manifest_hash)
+
     def test_manifest_serialization_roundtrip(self):
         d = self.manifest.to_dict()
         restored = AgentManifest.from_dict(d)
         self.assertEqual(restored.identity.name, "TestAgent")
         self.assertEqual(restored.total_actions, 2)
 
+    def test_tags_are_interned(self):
+        a = Capability(**json.loads('{"name": "a", "description": "", "tags": ["web-scraping"]}'))
+        b = Capability(**json.loads('{"name": "b", "description": "", "tags": ["web-scraping"]}'))
+        self.assertIs(a.tags[0], b.tags[0])
+
 
 class TestMessage(unittest.TestCase):
     def test_auto_id_and_timestamp(self):
@@ -105,6 +166,12 @@ class TestMessage(unittest.TestCase):
         self.assertTrue(len(msg.message_id) > 0)
         self.assertTrue(len(msg.timestamp) > 0)
 
+    def test_ids_are_short_and_unique(self):
+        ids = {Message(subject="x").message_id for _ in range(100)}
+        self.assertEqual(len(ids), 100)
+        for message_id in ids:
+            self.assertRegex(message_id, r"^[A-Za-z0-9_-]{22}$")
+
     def test_expiry(self):
         msg = Message(
             from_agent="a1",
@@ -118,6 +185,15 @@ class TestMessage(unittest.TestCase):
         msg = Message(from_agent="a1", to_agent="a2", ttl_seconds=3600)
         self.assertFalse(msg.is_expired)
 
+    def test_naive_timestamps_are_utc(self):
+        self.assertEqual(agent_protocol._iso_to_ts("1970-01-01T00:01:00"), 60.0)
+        self.assertEqual(agent_protocol._iso_to_ts("1970-01-01T01:01:00+01:00"), 60.0)
+        stamp = "2026-03-01T12:34:56.789012"
+        self.assertEqual(
+            agent_protocol._iso_to_ts(stamp),
+            datetime.fromisoformat(stamp + "+00:00").timestamp(),
+        )
+
     def test_roundtrip(self):
         msg = Message(from_agent="a1", to_agent="a2", subject="Test", body={"key": "val"})
         restored = Message.from_dict(msg.to_dict())
@@ -131,6 +207,18 @@ class TestKnowledgeEntry(unittest.TestCase):
         e2 = KnowledgeEntry(content="Dynamic pricing improves margins by 15%")
         self.assertEqual(e1.entry_id, e2.entry_id)
 
+    def test_entry_id_is_stable_across_agents(self):
+        # Other agents derive the same IDs, so the derivation must not change
+        content = "Dynamic pricing improves margins by 15%"
+        expected = hashlib.sha256(content.encode()).hexdigest()[:16]
+        self.assertEqual(KnowledgeEntry(content=content).entry_id, expected)
+
+    def test_hydrating_stored_entry_does_not_rehash(self):
+        stored = KnowledgeEntry(content="Fact A").to_dict()
+        with mock.patch.object(agent_protocol.hashlib, "sha256") as sha256:
+            self.assertEqual(KnowledgeEntry.from_dict(stored).entry_id, stored["entry_id"])
+        sha256.assert_not_called()
+
     def test_different_content_different_id(self):
         e1 = KnowledgeEntry(content="Fact A")
         e2 = KnowledgeEntry(content="Fact B")
@@ -150,6 +238,23 @@ class TestKnowledgeEntry(unittest.TestCase):
         e = KnowledgeEntry(content="test", confidence=0.5, disputes=["a1", "a2"])
         self.assertLess(e.relevance_score, 0.5)
 
+    def test_raw_relevance_matches_entry(self):
+        now = agent_protocol.time.time()
+        old = (datetime.utcnow() - timedelta(days=2)).isoformat()
+        raw = {"content": "x", "confidence": 0.6, "endorsements": ["a1"],
+               "disputes": ["a2", "a3"], "published_at": old}
+        self.assertAlmostEqual(
+            agent_protocol._knowledge_relevance(raw, now),
+            KnowledgeEntry.from_dict(raw).relevance_score,
+            places=6,
+        )
+        # A missing publish time counts as fresh, as from_dict would stamp it
+        self.assertAlmostEqual(
+            agent_protocol._knowledge_relevance({"content": "x"}, now),
+            KnowledgeEntry.from_dict({"content": "x"}).relevance_score,
+            places=6,
+        )
+
     def test_expiry(self):
         e = KnowledgeEntry(
             content="old news",
@@ -168,6 +273,158 @@ class TestServiceListing(unittest.TestCase):
         self.assertEqual(s.profit_margin, 0.0)
 
 
+class TestJsonStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "store.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_roundtrip(self):
+        store = agent_protocol.JsonStore(self.path)
+        store.save({"a": {"b": [1, 2, 3]}, "when": datetime(2024, 1, 1)})
+        data = store.load()
+        self.assertEqual(data["a"]["b"], [1, 2, 3])
+        self.assertTrue(data["when"].startswith("2024-01-01"))
+
+    def test_roundtrip_without_orjson(self):
+        with mock.patch.object(agent_protocol, "orjson", None):
+            store = agent_protocol.JsonStore(self.path)
+            store.save({"key": "val"})
+            self.assertEqual(store.load(), {"key": "val"})
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {"key": "val"})
+
+    def test_compact_unless_pretty(self):
+        agent_protocol.JsonStore(self.path).save({"a": [1, 2]})
+        with open(self.path) as f:
+            self.assertEqual(f.read(), '{"a":[1,2]}')
+
+        agent_protocol.JsonStore(self.path, pretty=True).save({"a": [1, 2]})
+        with open(self.path) as f:
+            self.assertIn("\n", f.read())
+
+    def test_load_reuses_cache_until_file_changes(self):
+        store = agent_protocol.JsonStore(self.path)
+        store.save({"n": 1})
+        self.assertIs(store.load(), store.load())
+
+        agent_protocol.JsonStore(self.path).save({"n": 2})
+        self.assertEqual(store.load(), {"n": 2})
+
+        os.remove(self.path)
+        self.assertEqual(store.load(), {})
+
+    def test_corrupt_file_loads_empty(self):
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        self.assertEqual(agent_protocol.JsonStore(self.path).load(), {})
+
+    @unittest.skipIf(agent_protocol.fcntl is None, "requires fcntl")
+    def test_concurrent_updates_are_not_lost(self):
+        def writer(n):
+            store = agent_protocol.JsonStore(self.path)
+            for i in range(20):
+                store.update(f"w{n}-{i}", i)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(agent_protocol.JsonStore(self.path).load()), 80)
+
+    def test_failed_update_leaves_file_untouched(self):
+        store = agent_protocol.JsonStore(self.path)
+        store.save({"n": 1})
+
+        def boom(data):
+            data["n"] = 2
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            store._locked_update(boom)
+        self.assertEqual(store.load(), {"n": 1})
+
+
+class TestJsonlStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "inbox.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_reader_sees_appends_and_rewrites(self):
+        reader = agent_protocol.JsonlStore(self.path)
+        writer = agent_protocol.JsonlStore(self.path)
+        self.assertEqual(reader.read_all(), [])
+
+        writer.extend([{"n": 1}, {"n": 2}])
+        self.assertEqual(reader.read_all(), [{"n": 1}, {"n": 2}])
+        writer.append({"n": 3})
+        self.assertEqual([r["n"] for r in reader.read_all()], [1, 2, 3])
+
+        writer.rewrite([{"n": 9}])
+        self.assertEqual(reader.read_all(), [{"n": 9}])
+
+    def test_partial_line_is_left_for_later(self):
+        store = agent_protocol.JsonlStore(self.path)
+        with open(self.path, "wb") as f:
+            f.write(b'{"n": 1}\nnot json\n{"n": ')
+        self.assertEqual(store.read_all(), [{"n": 1}])
+        with open(self.path, "ab") as f:
+            f.write(b'2}\n')
+        self.assertEqual(store.read_all(), [{"n": 1}, {"n": 2}])
+
+
+class TestSqliteStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.conn = agent_protocol._connect_sqlite(os.path.join(self.tmpdir, "test.db"))
+        self.store = agent_protocol.SqliteStore(
+            self.conn, "items", columns=("owner",), list_columns=("tags",),
+        )
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_put_get_delete(self):
+        self.store.put("k1", {"owner": "a", "tags": ["x"], "n": 1})
+        self.assertEqual(self.store.get("k1")["n"], 1)
+        self.store.delete("k1")
+        self.assertIsNone(self.store.get("k1"))
+        self.assertTrue(self.store.is_empty())
+
+    def test_query_by_column_and_tags(self):
+        self.store.put("k1", {"owner": "a", "tags": ["x", "y"]})
+        self.store.put("k2", {"owner": "b", "tags": ["y"]})
+        self.store.put("k3", {"owner": "a", "tags": ["z"]})
+
+        self.assertEqual(len(self.store.query(owner="a")), 2)
+        self.assertEqual(len(self.store.query({"tags": ["y"]})), 2)
+        self.assertEqual(len(self.store.query({"tags": ["y", "z"]}, owner="a")), 2)
+
+        # Re-putting a record replaces its tags and keeps its position
+        self.store.put("k1", {"owner": "a", "tags": ["z"]})
+        self.assertEqual(len(self.store.query({"tags": ["y"]})), 1)
+        self.assertEqual(list(self.store.load()), ["k1", "k2", "k3"])
+
+    def test_transaction_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with agent_protocol._sqlite_transaction(self.conn):
+                self.store._put("k1", {"owner": "a", "tags": ["x"]})
+                raise RuntimeError
+        self.assertIsNone(self.store.get("k1"))
+        self.assertEqual(self.store.query({"tags": ["x"]}), [])
+
+        with agent_protocol._sqlite_transaction(self.conn):
+            self.store._put("k1", {"owner": "a"})
+        self.assertEqual(self.store.get("k1"), {"owner": "a"})
+
+
 class TestAgentNetwork(unittest.TestCase):
     def setUp(self):
         self.tmpdir = tempfile.mkdtemp()
@@ -177,6 +434,8 @@ class TestAgentNetwork(unittest.TestCase):
         self.network_b = AgentNetwork(self.identity_b, data_dir=self.tmpdir)
 
     def tearDown(self):
+        self.network_a.close()
+        self.network_b.close()
         shutil.rmtree(self.tmpdir, ignore_errors=True)
 
     # ─── Registration & Discovery ─────
@@ -200,6 +459,21 @@ class TestAgentNetwork(unittest.TestCase):
         writers = self.network_a.discover_agents(agent_type="writer")
         self.assertEqual(len(writers), 1)
 
+    def test_discover_by_tags(self):
+        self.network_a.register(AgentManifest(
+            identity=self.identity_a,
+            capabilities=[CapabilityGroup(
+                skill_id="code",
+                name="Code",
+                description="Coding tasks",
+                actions=[Capability(name="review", description="Review", tags=["code"])],
+            )],
+        ))
+        self.network_b.register()
+
+        self.assertEqual(len(self.network_b.discover_agents(tags=["code"])), 1)
+        self.assertEqual(len(self.network_b.discover_agents(tags=["writing"])), 0)
+
     def test_discover_excludes_self(self):
         self.network_a.register()
         agents = self.network_a.discover_agents()
@@ -215,6 +489,20 @@ class TestAgentNetwork(unittest.TestCase):
         self.network_a.heartbeat()
         # Should not error
 
+    def test_legacy_json_agents_are_imported(self):
+        from adam_toolkit.agent_protocol import JsonStore
+        JsonStore(os.path.join(self.tmpdir, "agents.json")).save({
+            "agent_c": {
+                "manifest": AgentManifest(identity=AgentIdentity("agent_c", "Carol", "CAROL")).to_dict(),
+                "status": "online",
+            },
+        })
+
+        network = AgentNetwork(self.identity_b, data_dir=self.tmpdir)
+        self.addCleanup(network.close)
+        self.assertEqual([m.identity.name for m in network.discover_agents()], ["Carol"])
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, "agents.json")))
+
     # ─── Messaging ────────────────────
 
     def test_send_and_receive_message(self):
@@ -251,6 +539,29 @@ class TestAgentNetwork(unittest.TestCase):
         received2 = self.network_b.check_messages(drain=False)
         self.assertEqual(len(received2), 1)
 
+    def test_read_messages_do_not_alias_the_inbox(self):
+        self.network_a.send_message(Message(to_agent="agent_b", body={"k": [1]}))
+
+        self.network_b.check_messages(drain=False)[0].body["k"].append(99)
+        self.assertEqual(self.network_b.check_messages(drain=False)[0].body, {"k": [1]})
+
+    def test_legacy_json_messages_are_imported(self):
+        from adam_toolkit.agent_protocol import JsonStore
+        pending = Message(from_agent="agent_a", to_agent="agent_c", subject="Before upgrade")
+        JsonStore(os.path.join(self.tmpdir, "messages.json")).save({
+            "agent_c": [pending.to_dict()],
+        })
+
+        network = AgentNetwork(AgentIdentity("agent_c", "Carol", "CAROL"), data_dir=self.tmpdir)
+        self.addCleanup(network.close)
+        self.assertEqual([m.subject for m in network.check_messages()], ["Before upgrade"])
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, "messages.json")))
+
+        # Imported once: a later start doesn't deliver them again
+        again = AgentNetwork(AgentIdentity("agent_c", "Carol", "CAROL"), data_dir=self.tmpdir)
+        self.addCleanup(again.close)
+        self.assertEqual(again.check_messages(), [])
+
     def test_filter_by_message_type(self):
         self.network_a.send_message(Message(
             to_agent="agent_b",
@@ -267,6 +578,17 @@ class TestAgentNetwork(unittest.TestCase):
         self.assertEqual(len(requests), 1)
         self.assertEqual(requests[0].subject, "Request")
 
+    def test_filtered_drain_keeps_other_messages(self):
+        for i, mtype in enumerate(["request", "broadcast", "request", "broadcast"]):
+            self.network_a.send_message(Message(
+                to_agent="agent_b", message_type=mtype, subject=str(i),
+            ))
+
+        requests = self.network_b.check_messages(message_type="request")
+        self.assertEqual([m.subject for m in requests], ["0", "2"])
+        rest = self.network_b.check_messages()
+        self.assertEqual([m.subject for m in rest], ["1", "3"])
+
     def test_reply(self):
         self.network_a.send_message(Message(to_agent="agent_b", subject="Question"))
         received = self.network_b.check_messages()
@@ -319,6 +641,58 @@ class TestAgentNetwork(unittest.TestCase):
         code_services = self.network_b.list_services(tags=["code"])
         self.assertEqual(len(code_services), 1)
 
+    def test_filter_services_by_agent(self):
+        self.network_a.publish_service(ServiceListing(name="Mine", price=0.10, tags=["code"]))
+        self.network_b.publish_service(ServiceListing(name="Theirs", price=0.10, tags=["code"]))
+
+        mine = self.network_b.list_services(tags=["code"], agent_id="agent_a")
+        self.assertEqual([s.name for s in mine], ["Mine"])
+
+    def test_republish_updates_tag_index(self):
+        service = self.network_a.publish_service(ServiceListing(
+            name="Review", price=0.10, tags=["code"],
+        ))
+        service.tags = ["writing"]
+        self.network_a.publish_service(service)
+
+        self.assertEqual(len(self.network_b.list_services(tags=["code"])), 0)
+        self.assertEqual(len(self.network_b.list_services(tags=["writing"])), 1)
+
+    def test_legacy_json_marketplace_is_imported(self):
+        from adam_toolkit.agent_protocol import JsonStore
+        listing = ServiceListing(name="Legacy", price=0.10, tags=["code"], agent_id="agent_a")
+        order = ServiceOrder(service_id=listing.service_id, customer_agent_id="agent_b")
+        JsonStore(os.path.join(self.tmpdir, "marketplace.json")).save({
+            "services": {listing.service_id: listing.to_dict()},
+        })
+        JsonStore(os.path.join(self.tmpdir, "orders.json")).save({
+            order.order_id: order.to_dict(),
+        })
+
+        network = AgentNetwork(self.identity_b, data_dir=self.tmpdir)
+        self.addCleanup(network.close)
+        self.assertEqual(len(network.list_services(tags=["code"])), 1)
+        self.assertEqual(len(network.list_services(agent_id="agent_a")), 1)
+        self.assertIsNotNone(network.get_order(order.order_id))
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, "marketplace.json")))
+
+    def test_late_legacy_import_keeps_imported_rows(self):
+        from adam_toolkit.agent_protocol import JsonStore
+        listing = ServiceListing(name="Legacy", price=0.10, agent_id="agent_a")
+        JsonStore(os.path.join(self.tmpdir, "marketplace.json")).save({
+            "services": {listing.service_id: listing.to_dict()},
+        })
+        network = AgentNetwork(self.identity_b, data_dir=self.tmpdir)
+        self.addCleanup(network.close)
+
+        # A second agent that saw the file, and an empty table, before the
+        # first one imported and renamed it
+        store = self.network_a._services_store
+        with mock.patch("os.path.exists", side_effect=[True, False]), \
+                mock.patch.object(store, "is_empty", return_value=True):
+            self.network_a._import_legacy_json(store, "marketplace.json", key="services")
+        self.assertEqual(len(network.list_services(agent_id="agent_a")), 1)
+
     def test_filter_services_by_price(self):
         self.network_a.publish_service(ServiceListing(name="Cheap", price=0.01))
         self.network_a.publish_service(ServiceListing(name="Expensive", price=10.0))
@@ -401,6 +775,22 @@ class TestAgentNetwork(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertIn("pricing", results[0].content.lower())
 
+    def test_knowledge_query_limit_keeps_most_relevant(self):
+        for i, confidence in enumerate([0.2, 0.7, 0.4, 0.6, 0.3]):
+            self.network_a.publish_knowledge(KnowledgeEntry(content=f"tip {i}", confidence=confidence))
+
+        results = self.network_b.query_knowledge(limit=3)
+        self.assertEqual([e.content for e in results], ["tip 1", "tip 3", "tip 2"])
+
+    def test_knowledge_category_filter(self):
+        self.network_a.publish_knowledge(KnowledgeEntry(content="Undercut by 5%", category="market"))
+        self.network_a.publish_knowledge(KnowledgeEntry(content="Batch LLM calls"))
+
+        market = self.network_b.query_knowledge(category=KnowledgeCategory.MARKET)
+        self.assertEqual([e.content for e in market], ["Undercut by 5%"])
+        strategy = self.network_b.query_knowledge(category="strategy", search_text="batch")
+        self.assertEqual([e.content for e in strategy], ["Batch LLM calls"])
+
     def test_knowledge_deduplication(self):
         content = "Caching reduces API costs by 40%"
         self.network_a.publish_knowledge(KnowledgeEntry(content=content, confidence=0.6))
@@ -411,6 +801,14 @@ class TestAgentNetwork(unittest.TestCase):
         # Higher confidence should win
         self.assertGreaterEqual(results[0].confidence, 0.9)
 
+    def test_duplicate_knowledge_skips_write(self):
+        content = "Batch requests to cut latency"
+        self.network_a.publish_knowledge(KnowledgeEntry(content=content, confidence=0.8))
+
+        with mock.patch.object(agent_protocol.JsonStore, "save", side_effect=AssertionError):
+            self.network_b.publish_knowledge(KnowledgeEntry(content=content, confidence=0.5))
+        self.assertEqual(self.network_b.query_knowledge()[0].confidence, 0.8)
+
     def test_knowledge_tag_filter(self):
         self.network_a.publish_knowledge(KnowledgeEntry(
             content="Fact A", tags=["pricing"],
@@ -429,6 +827,66 @@ class TestAgentNetwork(unittest.TestCase):
         results = self.network_b.query_knowledge(search_text="Python")
         self.assertEqual(len(results), 1)
 
+    def test_knowledge_text_search_is_substring_match(self):
+        self.network_a.publish_knowledge(KnowledgeEntry(content="Respect API rate limits"))
+        self.assertEqual(len(self.network_b.query_knowledge(search_text="TE LIM")), 1)
+        self.assertEqual(len(self.network_b.query_knowledge(search_text="ra")), 1)
+        self.assertEqual(len(self.network_b.query_knowledge(search_text="t ")), 1)
+        self.assertEqual(self.network_b.query_knowledge(search_text="zq"), [])
+        self.assertEqual(len(self.network_b.query_knowledge(search_text="I")), 1)
+        self.assertEqual(self.network_b.query_knowledge(search_text="rate limiter"), [])
+
+        # The index follows later writes to the store
+        self.network_a.publish_knowledge(KnowledgeEntry(content="Cache rate tables", tags=["cache"]))
+        self.assertEqual(len(self.network_b.query_knowledge(search_text="rate")), 2)
+        self.assertEqual(len(self.network_b.query_knowledge(tags=["cache"], search_text="rate")), 1)
+
+    def test_repeat_knowledge_query_is_cached(self):
+        self.network_a.publish_knowledge(KnowledgeEntry(content="Cache hot queries"))
+        first = self.network_b.query_knowledge(search_text="cache")
+
+        with mock.patch.object(KnowledgeEntry, "from_dict", side_effect=AssertionError):
+            again = self.network_b.query_knowledge(search_text="cache")
+        self.assertEqual(again, first)
+        self.assertIsNot(again, first)
+
+        # A write to the store invalidates the cached results
+        self.network_a.publish_knowledge(KnowledgeEntry(content="Cache warm queries too"))
+        self.assertEqual(len(self.network_b.query_knowledge(search_text="cache")), 2)
+
+    def test_knowledge_query_reuses_parsed_stamps(self):
+        entry = KnowledgeEntry(content="Stamps are parsed once")
+        self.network_a.publish_knowledge(entry)
+        first = self.network_b.query_knowledge()
+
+        self.network_b._knowledge_queries.clear()
+        with mock.patch.object(agent_protocol, "_stamp_ts", side_effect=AssertionError):
+            self.assertEqual(self.network_b.query_knowledge(), first)
+
+        # Rewriting an entry's expiry in the store is picked up
+        data = self.network_a._knowledge_store.load()
+        expired = dict(data["entries"][entry.entry_id])
+        expired["expires_at"] = (datetime.utcnow() - timedelta(days=1)).isoformat()
+        self.network_a._knowledge_store.save({"entries": {entry.entry_id: expired}})
+        self.assertEqual(self.network_b.query_knowledge(), [])
+
+    def test_query_results_do_not_alias_the_store(self):
+        entry = KnowledgeEntry(content="Profile before optimizing", tags=["perf"])
+        self.network_a.publish_knowledge(entry)
+
+        first = self.network_b.query_knowledge()[0]
+        first.tags.append("INJECTED")
+        first.endorsements.append("ghost")
+        again = self.network_b.query_knowledge()[0]
+        self.assertEqual(again.tags, ["perf"])
+        self.assertEqual(again.endorsements, [])
+
+        self.network_b.endorse_knowledge(entry.entry_id)
+        with open(os.path.join(self.tmpdir, "knowledge_store.json")) as f:
+            stored = json.load(f)["entries"][entry.entry_id]
+        self.assertEqual(stored["tags"], ["perf"])
+        self.assertEqual(stored["endorsements"], ["agent_b"])
+
     def test_endorse_knowledge(self):
         entry = KnowledgeEntry(content="Important fact", confidence=0.5)
         self.network_a.publish_knowledge(entry)
@@ -455,6 +913,18 @@ class TestAgentNetwork(unittest.TestCase):
         # Should only have one endorsement
         self.assertEqual(len(result1.endorsements), 1)
 
+    def test_noop_endorse_and_dispute_skip_the_save(self):
+        entry = KnowledgeEntry(content="Fact", confidence=0.5)
+        self.network_a.publish_knowledge(entry)
+        self.network_b.endorse_knowledge(entry.entry_id)
+        self.network_b.dispute_knowledge(entry.entry_id)
+
+        with mock.patch.object(agent_protocol.JsonStore, "save", side_effect=AssertionError):
+            self.assertEqual(len(self.network_b.endorse_knowledge(entry.entry_id).endorsements), 1)
+            self.assertEqual(len(self.network_b.dispute_knowledge(entry.entry_id).disputes), 1)
+            self.assertIsNone(self.network_b.endorse_knowledge("missing"))
+            self.assertIsNone(self.network_b.dispute_knowledge("missing"))
+
     # ─── Stats & Cleanup ─────────────
 
     def test_my_stats(self):
@@ -467,24 +937,54 @@ class TestAgentNetwork(unittest.TestCase):
 
     def test_cleanup_expired(self):
         # Add an expired message
-        from adam_toolkit.agent_protocol import JsonStore
-        msg_store = JsonStore(os.path.join(self.tmpdir, "messages.json"))
-        msg_store.save({
-            "agent_a": [
-                Message(
-                    from_agent="agent_b",
-                    to_agent="agent_a",
-                    subject="Old msg",
-                    timestamp=(datetime.utcnow() - timedelta(hours=2)).isoformat(),
-                    ttl_seconds=3600,
-                ).to_dict(),
-            ]
-        })
+        from adam_toolkit.agent_protocol import JsonlStore
+        inbox = JsonlStore(self.network_a._inbox_store("agent_a").file_path)
+        inbox.append(Message(
+            from_agent="agent_b",
+            to_agent="agent_a",
+            subject="Old msg",
+            timestamp=(datetime.utcnow() - timedelta(hours=2)).isoformat(),
+            ttl_seconds=3600,
+        ).to_dict())
 
         self.network_a.cleanup_expired()
+        self.assertEqual(inbox.read_all(), [])
         msgs = self.network_a.check_messages()
         self.assertEqual(len(msgs), 0)
 
+    def test_cleanup_without_expired_data_leaves_files_alone(self):
+        self.network_a.send_message(Message(to_agent="agent_b", subject="Fresh"))
+        self.network_a.publish_knowledge(KnowledgeEntry(content="Still valid"))
+        paths = [
+            self.network_a._inbox_store("agent_b").file_path,
+            os.path.join(self.tmpdir, "knowledge_store.json"),
+        ]
+        before = [os.stat(p).st_ino for p in paths]
+
+        self.network_a.cleanup_expired()
+        self.assertEqual([os.stat(p).st_ino for p in paths], before)
+        self.assertEqual(len(self.network_b.query_knowledge()), 1)
+
+    def test_send_appends_to_recipient_inbox(self):
+        self.network_a.send_message(Message(to_agent="agent_b", subject="One"))
+        self.network_a.send_message(Message(to_agent="agent_b", subject="Two"))
+
+        path = self.network_a._inbox_store("agent_b").file_path
+        self.assertEqual(os.path.dirname(os.path.dirname(path)), os.path.join(self.tmpdir, "messages"))
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual([json.loads(l)["subject"] for l in lines], ["One", "Two"])
+
+    def test_inbox_queue_limit(self):
+        from adam_toolkit.agent_protocol import MAX_MESSAGE_QUEUE
+
+        for i in range(MAX_MESSAGE_QUEUE + 5):
+            self.network_a.send_message(Message(to_agent="agent_b", subject=str(i)))
+
+        received = self.network_b.check_messages()
+        self.assertEqual(len(received), MAX_MESSAGE_QUEUE)
+        self.assertEqual(received[0].subject, "5")
+
     def test_find_agent_for_task(self):
         manifest_a = AgentManifest(
             identity=self.identity_a,
@@ -510,6 +1010,42 @@ class TestAgentNetwork(unittest.TestCase):
         self.assertEqual(results[0][0].identity.name, "Alice")
 
 
+class TestSerialization(unittest.TestCase):
+    def test_to_dict_covers_all_fields(self):
+        samples = [
+            AgentIdentity("a1", "Bob", "BOB"),
+            Capability(name="review", description="Review"),
+            Message(to_agent="a2"),
+            ServiceListing(name="Svc"),
+            ServiceOrder(service_id="svc_1"),
+            KnowledgeEntry(content="fact"),
+        ]
+        for obj in samples:
+            self.assertEqual(
+                list(obj.to_dict()), [f.name for f in fields(obj)], type(obj).__name__,
+            )
+
+    def test_record_types_use_slots(self):
+        samples = [
+            AgentIdentity("a1", "Bob", "BOB"),
+            CapabilityGroup(skill_id="code", name="Code", description="Coding"),
+            Message(to_agent="a2"),
+            ServiceListing(name="Svc"),
+            ServiceOrder(service_id="svc_1"),
+            KnowledgeEntry(content="fact"),
+        ]
+        for obj in samples:
+            self.assertFalse(hasattr(obj, "__dict__"), type(obj).__name__)
+
+
+    def test_from_dict_ignores_unknown_keys(self):
+        data = Message(to_agent="a2", subject="Hi").to_dict()
+        data["unexpected"] = True
+        restored = Message.from_dict(data)
+        self.assertEqual(restored.subject, "Hi")
+        self.assertIn("unexpected", data)
+
+
 class TestServiceOrder(unittest.TestCase):
     def test_auto_id(self):
         order = ServiceOrder(service_id="svc_1", customer_agent_id="a1")
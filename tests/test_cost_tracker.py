@@ -87,3 +87,98 @@ def test_summary():
     assert summary["net_profit"] == 0.09
     assert "costs_by_category" in summary
     assert "revenue_by_source" in summary
+
+
+def test_running_totals_match_entries():
+    tracker = CostTracker(balance=100.0)
+
+    for i in range(50):
+        tracker.record_cost("llm" if i % 2 else "compute", 0.001 * i)
+        tracker.record_revenue("review", 0.002 * i)
+
+    assert tracker.total_costs == approx(sum(e.amount for e in tracker._costs))
+    assert tracker.total_revenue == approx(sum(e.amount for e in tracker._revenues))
+    assert tracker.costs_by_category() == approx(tracker.costs_by_category(hours=1.0))
+    assert list(tracker.costs_by_category()) == ["llm", "compute"]
+
+
+def test_rolling_windows_drop_old_entries(monkeypatch):
+    tracker = CostTracker(balance=100.0)
+    now = time.time()
+
+    old = tracker.record_cost("llm", 1.0)
+    old.timestamp = now - 30 * 3600
+    tracker.record_cost("llm", 0.5)
+    tracker.record_revenue("review", 2.0)
+
+    assert tracker.daily_spend == approx(0.5)
+    assert tracker.daily_revenue == approx(2.0)
+    assert tracker.hourly_spend == approx(0.5 / 0.1)
+
+    # Everything ages out of the 24h window
+    monkeypatch.setattr(time, "time", lambda: now + 25 * 3600)
+    assert tracker.daily_spend == 0.0
+    assert tracker.daily_revenue == 0.0
+    assert tracker.hourly_spend == tracker.base_burn_rate_hourly
+    assert tracker.total_costs == approx(1.5)
+
+
+def test_windowed_breakdown_skips_old_entries():
+    tracker = CostTracker(balance=100.0)
+
+    old = tracker.record_cost("llm", 1.0)
+    old.timestamp = time.time() - 30 * 3600
+    tracker.record_cost("llm", 0.25)
+    tracker.record_cost("compute", 0.5)
+    tracker.record_revenue("review", 2.0)
+
+    assert tracker.costs_by_category(hours=24) == {"compute": 0.5, "llm": 0.25}
+    assert tracker.costs_by_category() == {"llm": 1.25, "compute": 0.5}
+    assert tracker.revenue_by_source(hours=1) == {"review": 2.0}
+
+
+def test_entries_use_slots():
+    tracker = CostTracker(balance=1.0)
+    entry = tracker.record_cost("llm", 0.1)
+    assert not hasattr(entry, "__dict__")
+    assert not hasattr(tracker.record_revenue("review", 0.2), "__dict__")
+
+
+def test_breakdown_top_n():
+    tracker = CostTracker(balance=100.0)
+
+    for i in range(15):
+        tracker.record_cost(f"cat{i}", 0.01 * (i + 1))
+
+    top = tracker.costs_by_category(top_n=3)
+    assert list(top) == ["cat14", "cat13", "cat12"]
+    assert len(tracker.costs_by_category()) == 15
+    assert len(tracker.summary()["costs_by_category"]) == CostTracker.SUMMARY_TOP_N
+
+
+def test_windowed_breakdown_binary_search():
+    tracker = CostTracker(balance=100.0)
+    now = time.time()
+
+    for hours_ago in (50, 30, 10, 2, 0):
+        tracker.record_cost("llm", 1.0).timestamp = now - hours_ago * 3600
+
+    for hours in (1, 3, 12, 40, 60):
+        expected = sum(1.0 for e in tracker._costs if e.timestamp >= now - hours * 3600)
+        assert tracker.costs_by_category(hours=hours)["llm"] == approx(expected)
+    # Ad-hoc windows don't leave rolling-window state behind
+    assert tracker._windows == {}
+
+
+def test_out_of_order_timestamp_is_clamped():
+    tracker = CostTracker(balance=100.0)
+    now = time.time()
+
+    tracker.record_cost("api", 2.0, timestamp=now)
+    late = tracker.record_cost("llm", 1.0, timestamp=now - 30 * 3600)
+    tracker.record_revenue("review", 1.0, timestamp=now)
+    assert tracker.record_revenue("review", 1.0, timestamp=now - 1).timestamp == now
+
+    assert late.timestamp == now
+    assert tracker.costs_by_category(hours=24) == {"api": 2.0, "llm": 1.0}
+    assert tracker.daily_spend == approx(3.0)
@@ -100,3 +100,28 @@ def test_auto_risk_tolerance():
     tracker3 = CostTracker(balance=0.1, burn_rate_hourly=0.1)
     engine3 = DecisionEngine(tracker3)
     assert engine3.risk_tolerance == RiskTolerance.DESPERATE
+
+
+def test_rank_actions_matches_should_execute():
+    tracker = CostTracker(balance=5.0, burn_rate_hourly=0.05)
+    tracker.record_cost("llm", 0.2)
+    engine = DecisionEngine(tracker)
+
+    actions = [
+        {"action": f"a{i}", "estimated_cost": 0.01 * i, "estimated_revenue": 0.03 * i, "confidence": 0.6}
+        for i in range(1, 6)
+    ]
+    ranked = dict((params["action"], d) for params, d in engine.rank_actions(actions))
+    for params in actions:
+        assert ranked[params["action"]] == engine.should_execute(**params)
+
+
+def test_rank_actions_limit():
+    tracker = CostTracker(balance=50.0, burn_rate_hourly=0.02)
+    engine = DecisionEngine(tracker)
+    actions = [
+        {"action": f"a{i}", "estimated_cost": 0.01, "estimated_revenue": 0.01 * (i % 7), "confidence": 0.8}
+        for i in range(30)
+    ]
+
+    assert engine.rank_actions(actions, limit=5) == engine.rank_actions(actions)[:5]
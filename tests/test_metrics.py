@@ -1,5 +1,8 @@
 """Tests for the metrics collector module."""
 
+import json
+
+from adam_toolkit import metrics
 from adam_toolkit.metrics import MetricsCollector
 
 
@@ -77,3 +80,73 @@ def test_json_export():
     json_str = m.to_json()
     assert "test" in json_str
     assert "42" in json_str
+
+
+def test_histogram_retention_and_stats_refresh():
+    m = MetricsCollector(retention_hours=1.0)
+    m.histogram("latency", 500)
+    m._histograms["latency"].timestamps[0] -= 7200  # Age the first point out
+    m.histogram("latency", 100)
+
+    assert m.get_histogram_stats("latency")["count"] == 1
+    m.histogram("latency", 300)
+    stats = m.get_histogram_stats("latency")
+    assert stats["count"] == 2
+    assert stats["max"] == 300
+    assert m.get_histogram_stats("missing") == {"count": 0}
+
+
+def test_to_json_matches_stdlib_fallback(monkeypatch):
+    m = MetricsCollector()
+    m.increment("tasks", tags={"type": "review"})
+    m.histogram("latency", 12.5)
+    m.event("deploy", tags={"version": 2})
+
+    fast = json.loads(m.to_json())
+    monkeypatch.setattr(metrics, "orjson", None)
+    plain = json.loads(m.to_json())
+    del fast["uptime_hours"], plain["uptime_hours"]
+    assert fast == plain
+    assert fast["counters"] == {"tasks[type=review]": 1.0}
+
+
+def test_tagged_keys_are_order_independent():
+    m = MetricsCollector()
+    m.increment("tasks", tags={"type": "review", "tier": "gold"})
+    m.increment("tasks", tags={"tier": "gold", "type": "review"})
+    m.gauge("queue", 3, tags={"regions": ["eu", "us"]})  # Unhashable value
+
+    assert m.get_counter("tasks", tags={"type": "review", "tier": "gold"}) == 2
+    assert m.get_gauge("queue", tags={"regions": ["eu", "us"]}) == 3
+
+
+def test_tagged_keys_keep_value_formatting():
+    MetricsCollector().increment("x", tags={"v": 1.0})  # Warm the shared cache
+    m = MetricsCollector()
+    m.increment("x", tags={"v": 1})
+    m.increment("x", tags={"v": True})
+    m.increment("x", tags={"v": 1.0})
+
+    assert set(m.summary()["counters"]) == {"x[v=1]", "x[v=True]", "x[v=1.0]"}
+
+
+def test_histogram_cleanup_is_batched():
+    m = MetricsCollector(retention_hours=1.0)
+    m.histogram("latency", 500)
+    hist = m._histograms["latency"]
+    hist.timestamps[0] -= 7200
+
+    m.histogram("latency", 100)
+    assert len(hist.values) == 2  # Expired point still pending cleanup
+    assert m.get_histogram_stats("latency")["count"] == 1
+    assert len(hist.values) == 1
+
+
+def test_events_keep_last_thousand():
+    m = MetricsCollector()
+    for i in range(1005):
+        m.event(f"e{i}")
+
+    summary = m.summary()
+    assert summary["total_events"] == 1000
+    assert [e["name"] for e in summary["recent_events"]] == [f"e{i}" for i in range(995, 1005)]
@@ -0,0 +1,51 @@
+"""Tests for the top-level adam_toolkit package."""
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import adam_toolkit
+
+
+def test_exports_resolve():
+    from adam_toolkit.cost_tracker import CostTracker
+
+    assert adam_toolkit.CostTracker is CostTracker
+    for name in adam_toolkit.__all__:
+        assert getattr(adam_toolkit, name) is not None
+
+
+def test_unknown_attribute_raises():
+    with pytest.raises(AttributeError):
+        adam_toolkit.DoesNotExist
+
+
+def test_dir_lists_exports():
+    assert set(adam_toolkit.__all__) <= set(dir(adam_toolkit))
+
+
+def test_submodules_loaded_lazily():
+    code = (
+        "import sys, adam_toolkit; "
+        "assert 'adam_toolkit.agent_protocol' not in sys.modules; "
+        "adam_toolkit.CostTracker; "
+        "assert 'adam_toolkit.cost_tracker' in sys.modules; "
+        "assert 'adam_toolkit.agent_protocol' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_version_matches_pyproject():
+    pyproject = Path(__file__).resolve().parent.parent / "pyproject.toml"
+    match = re.search(r'^version = "([^"]+)"', pyproject.read_text(), re.MULTILINE)
+    assert match is not None
+    assert adam_toolkit.__version__ == match.group(1)
+
+
+def test_preload_imports_submodules():
+    adam_toolkit.preload(background=False)
+    for mod_path in set(adam_toolkit._LAZY.values()):
+        assert mod_path in sys.modules
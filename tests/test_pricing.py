@@ -1,5 +1,9 @@
 """Tests for the pricing engine module."""
 
+import time
+
+from pytest import approx
+
 from adam_toolkit.pricing import PricingEngine, PricingStrategy
 
 
@@ -103,3 +107,82 @@ def test_min_max_price_bounds():
 
     rec = engine.recommend_price("test")
     assert rec.recommended_price <= 0.50
+
+
+def test_recent_orders_per_service_window():
+    engine = PricingEngine()
+    engine.register_service("a", base_cost=0.01, current_price=0.10)
+    engine.register_service("b", base_cost=0.01, current_price=0.10)
+
+    engine.record_order("a", price=0.10, cost=0.01)
+    engine._order_history[0].timestamp -= 200 * 3600  # Older than a week
+    for _ in range(3):
+        engine.record_order("a", price=0.10, cost=0.01)
+    engine.record_order("b", price=0.20, cost=0.01)
+
+    assert engine.service_summary("a")["orders_last_week"] == 3
+    assert engine.service_summary("b")["orders_last_week"] == 1
+    assert len(engine._service_orders["a"]) == 4
+
+
+def test_recent_window_ages_out_orders(monkeypatch):
+    engine = PricingEngine()
+    engine.register_service("a", base_cost=0.01, current_price=0.10)
+    now = time.time()
+
+    engine.record_order("a", price=0.10, cost=0.02)
+    assert engine.service_summary("a")["revenue_last_week"] == approx(0.10)
+
+    monkeypatch.setattr(time, "time", lambda: now + 100 * 3600)
+    engine.record_order("a", price=0.30, cost=0.06)
+    summary = engine.service_summary("a")
+    assert summary["orders_last_week"] == 2
+    assert summary["cost_last_week"] == approx(0.08)
+
+    monkeypatch.setattr(time, "time", lambda: now + 200 * 3600)
+    summary = engine.service_summary("a")
+    assert summary["orders_last_week"] == 1
+    assert summary["revenue_last_week"] == approx(0.30)
+    assert summary["avg_margin"] == approx(0.8)
+
+
+def test_competitive_pricing_uses_latest_competitor():
+    engine = PricingEngine()
+    engine.register_service(
+        "test", base_cost=0.01, current_price=0.10,
+        strategy=PricingStrategy.COMPETITIVE
+    )
+
+    assert engine.recommend_price("test").recommended_price == 0.10
+    engine.record_competitor_price("test", 0.08)
+    engine.record_competitor_price("other", 0.02)
+    engine.record_competitor_price("test", 0.05)
+
+    assert engine.recommend_price("test").recommended_price == approx(0.045)
+
+
+def test_history_free_strategies_skip_order_window():
+    engine = PricingEngine()
+    engine.register_service("test", base_cost=0.01, current_price=0.10)
+    engine.record_order("test", price=0.10, cost=0.01)
+
+    for strategy in (PricingStrategy.SURVIVAL, PricingStrategy.COST_PLUS,
+                     PricingStrategy.COMPETITIVE):
+        engine.recommend_price("test", strategy_override=strategy)
+    assert engine._windows == {}
+
+    # FIXED reports the margin actually earned on recent orders
+    rec = engine.recommend_price("test", strategy_override=PricingStrategy.FIXED)
+    assert rec.estimated_margin == approx(0.9)
+
+
+def test_out_of_order_timestamp_is_clamped():
+    engine = PricingEngine()
+    engine.register_service("a", base_cost=0.01, current_price=0.10)
+    now = time.time()
+
+    engine.record_order("a", price=0.10, cost=0.01, timestamp=now)
+    engine.record_order("a", price=0.20, cost=0.01, timestamp=now - 200 * 3600)
+
+    assert [o.timestamp for o in engine._order_history] == [now, now]
+    assert engine.service_summary("a")["orders_last_week"] == 2
@@ -0,0 +1,180 @@
+"""Tests for the service registry module."""
+
+import asyncio
+import sys
+import time
+
+import pytest
+from pytest import approx
+
+from adam_toolkit.cost_tracker import CostTracker
+from adam_toolkit.pricing import PricingEngine
+from adam_toolkit.service_registry import Service, ServiceRegistry, ServiceResult
+
+
+def test_stats_track_last_hundred_calls():
+    svc = Service(name="review", handler=lambda: None, price=0.10, estimated_cost=0.01)
+
+    svc.update_stats(ServiceResult(success=False, execution_time_ms=1000.0))
+    for _ in range(99):
+        svc.update_stats(ServiceResult(success=True, execution_time_ms=10.0, price_charged=0.10))
+    assert svc.success_rate == approx(0.99)
+    assert svc.avg_execution_ms == approx((1000.0 + 99 * 10.0) / 100)
+
+    # The failed slow call drops out of the window
+    svc.update_stats(ServiceResult(success=True, execution_time_ms=10.0, price_charged=0.10))
+    assert svc.total_calls == 101
+    assert svc.success_rate == 1.0
+    assert svc.avg_execution_ms == approx(10.0)
+    assert svc.total_revenue == approx(10.0)
+
+
+def test_execute_records_share_one_timestamp():
+    tracker = CostTracker(balance=10.0)
+    engine = PricingEngine()
+    registry = ServiceRegistry(cost_tracker=tracker, pricing_engine=engine)
+    registry.register("echo", lambda text: text, price=0.10, estimated_cost=0.01)
+    engine.register_service("echo", base_cost=0.01, current_price=0.10)
+
+    result = asyncio.run(registry.execute("echo", text="hi"))
+
+    assert result.success and result.data == "hi"
+    stamps = {tracker._costs[0].timestamp, tracker._revenues[0].timestamp,
+              engine._order_history[0].timestamp}
+    assert len(stamps) == 1
+
+
+def test_sync_service_runs_without_event_loop():
+    registry = ServiceRegistry()
+
+    @registry.service(name="double", price=0.05)
+    def double(x):
+        return x * 2
+
+    result = double(21)
+    assert result.success and result.data == 42
+
+    failed = registry.execute_sync("double")
+    assert not failed.success and "argument" in failed.error
+    assert registry.execute_sync("missing").error == "Unknown service: missing"
+    assert registry.get_service("double").total_calls == 2
+
+
+def test_async_service_wrapper_calls_its_service():
+    registry = ServiceRegistry()
+
+    @registry.service(name="tag", price=0.05)
+    async def tag(svc, text):
+        return f"{svc}:{text}"
+
+    result = asyncio.run(tag(svc="a", text="b"))
+    assert result.success and result.data == "a:b"
+    assert registry.execute_sync("tag", "x", "y").data == "x:y"
+
+
+def test_batched_bookkeeping_flushes():
+    tracker = CostTracker(balance=10.0)
+    registry = ServiceRegistry(cost_tracker=tracker, bookkeeping_batch=3)
+    registry.register("echo", lambda: None, price=0.10, estimated_cost=0.01)
+
+    registry.execute_sync("echo")
+    registry.execute_sync("echo")
+    assert tracker._costs == []
+    assert registry.get_service("echo").total_calls == 2
+
+    registry.execute_sync("echo")
+    assert len(tracker._costs) == 3
+    registry.execute_sync("echo")
+    registry.flush()
+    assert len(tracker._revenues) == 4
+    assert tracker.balance == approx(10.0 + 4 * 0.09)
+
+
+def test_batched_bookkeeping_keeps_tracker_in_time_order(monkeypatch):
+    tracker = CostTracker(balance=10.0)
+    registry = ServiceRegistry(cost_tracker=tracker, bookkeeping_batch=3)
+    registry.register("s", lambda: None, price=1.0, estimated_cost=0.5)
+    now = time.time()
+
+    monkeypatch.setattr(time, "time", lambda: now)
+    registry.execute_sync("s")
+    monkeypatch.setattr(time, "time", lambda: now + 30 * 3600)
+    tracker.record_cost("api", 2.0)
+    registry.execute_sync("s")
+    registry.execute_sync("s")
+
+    stamps = [e.timestamp for e in tracker._costs]
+    assert stamps == sorted(stamps)
+    assert tracker.costs_by_category(hours=24) == {"api": 2.0, "service:s": 1.5}
+    assert tracker.daily_spend == approx(3.5)
+
+
+def test_service_names_are_interned():
+    tracker = CostTracker(balance=10.0)
+    registry = ServiceRegistry(cost_tracker=tracker)
+    name = "".join(["ec", "ho"])  # Built at runtime, so not interned already
+    registry.register(name, lambda: None, price=0.10)
+
+    registry.execute_sync("echo")
+    registry.execute_sync("echo")
+
+    assert registry.get_service("echo").name is sys.intern("echo")
+    first, second = tracker._costs
+    assert first.category == "service:echo"
+    assert first.category is second.category
+
+
+def test_capabilities_snapshot_refreshes_on_register():
+    registry = ServiceRegistry()
+    registry.register("echo", lambda: None, price=0.10)
+
+    first = registry.capabilities()
+    assert registry.capabilities() is first
+    registry.execute_sync("echo")
+    assert first[0]["stats"]["total_calls"] == 0  # Stats lag until the TTL
+
+    registry.register("ping", lambda: None, price=0.01)
+    caps = registry.capabilities()
+    assert [c["name"] for c in caps] == ["echo", "ping"]
+    assert caps[0]["stats"]["total_calls"] == 1
+
+
+def test_handler_errors_lower_success_rate():
+    registry = ServiceRegistry()
+
+    def flaky(fail):
+        if fail:
+            raise RuntimeError("boom")
+        return "ok"
+
+    registry.register("flaky", flaky, price=0.10)
+    registry.execute_sync("flaky", fail=False)
+    registry.execute_sync("flaky", fail=True)
+
+    svc = registry.get_service("flaky")
+    assert svc.success_rate == 0.5
+    assert svc.total_revenue == 0.10
+
+
+@pytest.mark.parametrize("decoder", ["orjson", "json"])
+def test_execute_endpoint_decodes_body(monkeypatch, decoder):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    if decoder == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setitem(sys.modules, "orjson", None)  # Force the stdlib fallback
+
+    registry = ServiceRegistry()
+    registry.register("echo", lambda text="empty": text, price=0.10)
+    client = TestClient(registry.create_api())
+
+    assert client.post("/execute/echo").json()["data"] == "empty"
+    assert client.post("/execute/echo", content=b"not json").status_code == 400
+    assert client.post("/execute/echo", content=b"[1, 2]").status_code == 400
+    response = client.post("/execute/echo", json={"text": "hi"})
+    assert response.status_code == 200
+    assert response.json()["data"] == "hi"
+    assert registry.get_service("echo").total_calls == 2
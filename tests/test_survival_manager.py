@@ -65,3 +65,39 @@ def test_max_expense_scales_with_mode():
     assert status1.max_single_expense > status2.max_single_expense
     assert status1.max_single_expense == 100.0 * 0.30
     assert status2.max_single_expense == 0.3 * 0.05
+
+
+def test_recommended_actions_are_fresh_lists():
+    tracker = CostTracker(balance=0.5, burn_rate_hourly=0.1)
+    manager = SurvivalManager(tracker)
+
+    first = manager.assess().recommended_actions
+    assert first[-1].startswith("CRITICAL")
+    first.clear()
+
+    assert len(manager.assess().recommended_actions) == 6
+
+
+def test_mode_boundaries():
+    manager = SurvivalManager(CostTracker(balance=1.0, burn_rate_hourly=1.0))
+    expected = [
+        (6, SurvivalMode.PANIC),
+        (6.5, SurvivalMode.SURVIVAL),
+        (24, SurvivalMode.SURVIVAL),
+        (72, SurvivalMode.CAUTIOUS),
+        (100, SurvivalMode.GROWTH),
+        (168, SurvivalMode.GROWTH),
+        (169, SurvivalMode.THRIVING),
+    ]
+    for runway, mode in expected:
+        manager.tracker.balance = runway  # Burn is 1/hour, so runway == balance
+        assert manager.assess().mode == mode, runway
+
+
+def test_threshold_changes_apply_to_later_assessments():
+    tracker = CostTracker(balance=500.0, burn_rate_hourly=0.02)
+    manager = SurvivalManager(tracker)
+    assert manager.assess().mode == SurvivalMode.THRIVING
+
+    manager.THRIVING_THRESHOLD = 10 ** 6
+    assert manager.assess().mode == SurvivalMode.GROWTH